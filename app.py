@@ -1,14 +1,26 @@
+import functools
+import io
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
 from datetime import datetime
-from dateutil.parser import parse
+from data_loader import cache_stats, file_signature
+from repository import CSV_DIRECTORY, get_repository
+import instrumentation
+from instrumentation import span
+from snapshot import enable_copy_on_write
 
 # Must be the first Streamlit command
 st.set_page_config(page_title="🎓 Student Support System", layout="wide")
 
-# Initialize EventInfo.csv if it doesn't exist
+# Sessions share the snapshot's frames; derived frames must not write through to them
+enable_copy_on_write()
+
+# Widest banner we serve; larger images are scaled down once when first decoded
+BANNER_WIDTH = 1600
+
+# Initialize EventInfo.csv if it doesn't exist (once per process, not on every rerun)
+@st.cache_resource(show_spinner=False)
 def initialize_event_info():
     if not os.path.exists("EventInfo.csv"):
         event_info_df = pd.DataFrame(columns=[
@@ -17,7 +29,90 @@ def initialize_event_info():
         ])
         event_info_df.to_csv("EventInfo.csv", index=False)
 
-initialize_event_info()
+@st.cache_resource(show_spinner=False)
+def banner_image(path, signature):
+    """Decode the banner once per file version, scaled down if needed, and keep it as image bytes"""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        if image.width <= BANNER_WIDTH and image.format in ("JPEG", "PNG"):
+            # Already small enough for the browser to use as is
+            with open(path, "rb") as file:
+                return file.read()
+        image = image.convert("RGB")
+        if image.width > BANNER_WIDTH:
+            image = image.resize((BANNER_WIDTH, round(image.height * BANNER_WIDTH / image.width)))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+# The storage backend (CSV files, SQLite or MySQL) comes from the SIS_BACKEND setting
+repo = get_repository()
+
+if repo.name == "csv":
+    initialize_event_info()
+
+# Pin one consistent data version for this run; every session shares its frames.
+repo = repo.pinned()
+
+# Aggregates come from the precompute worker's published results when it runs;
+# its module is only loaded once a worker has published to .precomputed/
+if os.path.isdir(os.path.join(CSV_DIRECTORY, ".precomputed")):
+    from precompute import with_precomputed
+
+    repo = with_precomputed(repo)
+
+def show_table(table, key, where=None):
+    """Page through a table; the backend does the filtering, sorting and paging"""
+    from table_view import paginated_query
+
+    paginated_query(
+        repo.table_columns(table),
+        lambda **query: repo.table_count(table, where=where, **query),
+        lambda offset, limit, **query: repo.table_page(table, offset, limit, where=where, **query),
+        key=key
+    )
+
+def file_bytes(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+def export_jobs():
+    from exports import get_job
+
+    jobs = (get_job(job_id) for job_id in reversed(st.session_state.get("export_jobs", [])))
+    return [job for job in jobs if job is not None]
+
+def show_export_list(jobs):
+    for job in jobs:
+        label = f"{', '.join(job.tables)} ({job.scope}{'' if job.value is None else f' {job.value}'}, {job.export_format})"
+        if job.state == "running":
+            st.progress(job.progress(), text=f"{label}: {job.done:,} of {job.total or 0:,} rows")
+        elif job.state == "failed":
+            st.error(f"Export of {label} failed: {job.error}")
+        else:
+            st.success(f"Exported {label}: {job.done:,} rows in {job.finished - job.started:.1f}s")
+            # The file is only read when the button is clicked, not on every rerun
+            for path in job.paths:
+                st.download_button(f"⬇️ {os.path.basename(path)}", functools.partial(file_bytes, path),
+                                   os.path.basename(path), key=f"download_{job.id}_{path}")
+
+@st.fragment(run_every=1)
+def show_running_exports():
+    """Refresh the exports' progress every second until none is running"""
+    jobs = export_jobs()
+    show_export_list(jobs)
+    if not any(job.state == "running" for job in jobs):
+        # Draw the finished list once more outside this fragment, which stops the timer
+        st.rerun()
+
+def show_export_jobs():
+    """Show this session's exports; only polls while one of them is running"""
+    jobs = export_jobs()
+    if any(job.state == "running" for job in jobs):
+        show_running_exports()
+    else:
+        show_export_list(jobs)
 
 # Display the main title with custom styling
 st.markdown("""
@@ -32,232 +127,260 @@ st.markdown("""
 # Display image if it exists
 image_path = "image/dashboard_image.jpg"
 if os.path.exists(image_path):
-    image = Image.open(image_path)
-    st.image(image, use_container_width=True)
+    st.image(banner_image(image_path, file_signature(image_path)), use_container_width=True)
 else:
     st.info("Please add your dashboard image to the 'image' folder as 'dashboard_image.jpg'")
 
 # Check for required files
-if all(os.path.exists(f) for f in ["Attendance.csv", "Grade.csv", "Student_ID_Table.csv"]):
-    # Load data
-    attendance_df = pd.read_csv("Attendance.csv")
-    grade_df = pd.read_csv("Grade.csv")
-    student_df = pd.read_csv("Student_ID_Table.csv")
-    
-    # Load EventInfo from CSV
-    if os.path.exists("EventInfo.csv"):
-        event_info_df = pd.read_csv("EventInfo.csv")
-    else:
-        event_info_df = pd.DataFrame()
-
+if repo.available():
     # Sidebar Navigation
     section = st.sidebar.radio("📁 Select Section", 
                              ["Home", "Student Details", "Individual Student Search", 
                               "Attendance Overview", "Grades Overview", 
-                              "Event Information", "➕ Add Event Info"])
-
-    if section == "Home":
-        st.subheader("👋 Welcome to the Student Dashboard")
-        st.write("Use the sidebar to navigate through different student data views.")
-
-    elif section == "Student Details":
-        st.subheader("📋 Student Details")
-        st.dataframe(student_df)
-
-    elif section == "Individual Student Search":
-        st.subheader("🔍 Search Individual Student")
-        
-        # Get list of student IDs
-        student_ids = student_df['student_id'].unique()
-        
-        # Create a selectbox for student IDs
-        selected_student = st.selectbox("Select Student ID", student_ids)
-        
-        if st.button("Show Details"):
-            # Get student details
-            student_info = student_df[student_df['student_id'] == selected_student].iloc[0]
-            attendance_info = attendance_df[attendance_df['student_id'] == selected_student]
-            grade_info = grade_df[grade_df['student_id'] == selected_student]
-            
-            # Get student events
-            if not event_info_df.empty:
-                student_events = event_info_df[event_info_df['student_id'] == selected_student]
+                              "Event Information", "➕ Add Event Info", "📤 Export Data"])
+
+    # Show how often the data cache served a frame without re-parsing
+    with st.sidebar.expander("⚙️ Data Cache"):
+        st.caption(f"Storage backend: {repo.name}")
+        if repo.name == "csv":
+            st.caption(f"Data snapshot: version {repo.snapshot.version}")
+        results = getattr(repo, "results", None)
+        if results is not None:
+            st.caption(f"Precomputed results: version {results.version}")
+        st.dataframe(cache_stats(), hide_index=True)
+
+    with span("section", section=section):
+        if section == "Home":
+            st.subheader("👋 Welcome to the Student Dashboard")
+            st.write("Use the sidebar to navigate through different student data views.")
+
+        elif section == "Student Details":
+            st.subheader("📋 Student Details")
+            show_table("students", key="student_details")
+
+        elif section == "Individual Student Search":
+            st.subheader("🔍 Search Individual Student")
+
+            # Get list of student IDs
+            student_ids = repo.student_ids()
+
+            # Create a selectbox for student IDs
+            selected_student = st.selectbox("Select Student ID", student_ids)
+
+            if st.button("Show Details"):
+                # Get student details as per-student lookups in the backend
+                student_info = repo.student_records("students", selected_student).iloc[0]
+                attendance_info = repo.student_records("attendance", selected_student)
+                grade_info = repo.student_records("grades", selected_student)
+
+                # Get student events
+                student_events = repo.student_records("events", selected_student)
+
+                # Create three columns
+                col1, col2, col3 = st.columns(3)
+
+                with col1:
+                    st.markdown("### 👤 Student Information")
+                    st.write(f"**Student ID:** {student_info['student_id']}")
+                    st.write(f"**Personal Details:** {student_info['personal_details']}")
+                    st.write(f"**Academic Details:** {student_info['academic_details']}")
+
+                with col2:
+                    from attendance_aggregates import student_attendance
+
+                    st.markdown("### 📊 Attendance Summary")
+                    attendance_count = student_attendance(repo.attendance_summary(selected_student), selected_student)
+                    st.write("**Present:** ", int(attendance_count['Present']))
+                    st.write("**Absent:** ", int(attendance_count['Absent']))
+                    if attendance_count['total'] > 0:
+                        st.write(f"**Attendance Percentage:** {attendance_count['attendance_pct']:.2f}%")
+
+                with col3:
+                    st.markdown("### 📈 Grade Information")
+                    if not grade_info.empty:
+                        latest_grade = grade_info.iloc[0]
+                        st.write(f"**Total Marks:** {latest_grade['total_marks']}")
+                        st.write(f"**Status:** {latest_grade['status']}")
+                        st.write(f"**Remarks:** {latest_grade['remark']}")
+
+                # Show detailed attendance record
+                st.markdown("### 📅 Detailed Attendance Record")
+                st.dataframe(attendance_info)
+
+                # Show student events
+                if not student_events.empty:
+                    st.markdown("### 🎭 Student Event Participation")
+                    st.dataframe(student_events)
+
+        elif section == "Attendance Overview":
+            from attendance_aggregates import status_totals
+
+            st.subheader("📊 Attendance Summary")
+            # The charts read per-student aggregates computed by the backend
+            student_summary = repo.attendance_summary()
+            st.write("✅ Overall Attendance Count")
+            st.bar_chart(status_totals(student_summary))
+
+            # Attendance percentage by student, precomputed in one vectorized pass
+            attendance_by_student = student_summary['attendance_pct'].reset_index()
+            attendance_by_student.columns = ['Student ID', 'Attendance %']
+
+            st.subheader("📊 Attendance Percentage by Student")
+            st.bar_chart(attendance_by_student.set_index('Student ID'))
+
+            st.subheader("📆 Full Attendance Table")
+            show_table("attendance", key="attendance_table")
+
+        elif section == "Grades Overview":
+            # Read the per-student and per-course aggregates instead of re-aggregating every grade row
+            student_rollup = repo.grade_summary("student")
+
+            st.subheader("📈 Total Marks per Student (summed across courses)")
+            st.bar_chart(student_rollup['total_sum'].rename('total_marks_sum'))
+
+            st.markdown("🧮 *Grade Status Count*")
+            status_chart = repo.grade_status_counts()
+            st.write(status_chart)
+
+            st.subheader("📊 Average Marks by Student")
+            st.bar_chart(student_rollup['total_mean'].rename('total_marks'))
+
+            st.subheader("📚 Marks by Course")
+            st.dataframe(repo.grade_summary("course")[['count', 'total_mean', 'total_min', 'total_max', 'passed', 'failed']])
+
+            st.subheader("📄 Full Grade Sheet")
+            show_table("grades", key="grade_sheet")
+
+        elif section == "Event Information":
+            st.subheader("🎭 Student Event Participation Records")
+
+            # Check if we have event info data
+            if repo.table_count("events"):
+                # Display event information with filtering options
+                st.markdown("### 🔍 Filter Events")
+
+                # Unique student IDs and event names for the filters
+                unique_students, unique_events = repo.event_options()
+
+                # Create filters
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    selected_student = st.selectbox("Filter by Student ID", ["All"] + list(unique_students))
+
+                with col2:
+                    selected_event = st.selectbox("Filter by Event Name", ["All"] + list(unique_events))
+
+                # Apply filters in the backend and display the matches one page at a time
+                event_filters = {}
+                if selected_student != "All":
+                    event_filters["student_id"] = selected_student
+                if selected_event != "All":
+                    event_filters["event_name"] = selected_event
+                show_table("events", key="event_table", where=event_filters)
+
+                # Display participation metrics
+                st.markdown("### 📊 Event Participation Metrics")
+
+                col1, col2, col3 = st.columns(3)
+                total_events, total_participants, total_achievements = repo.event_metrics()
+
+                with col1:
+                    st.metric("Total Events", total_events)
+
+                with col2:
+                    st.metric("Total Student Participants", total_participants)
+
+                with col3:
+                    st.metric("Total Achievements", total_achievements)
             else:
-                student_events = pd.DataFrame()
-            
-            # Create three columns
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.markdown("### 👤 Student Information")
-                st.write(f"**Student ID:** {student_info['student_id']}")
-                st.write(f"**Personal Details:** {student_info['personal_details']}")
-                st.write(f"**Academic Details:** {student_info['academic_details']}")
-            
-            with col2:
-                st.markdown("### 📊 Attendance Summary")
-                attendance_count = attendance_info['status'].value_counts()
-                st.write("**Present:** ", attendance_count.get('Present', 0))
-                st.write("**Absent:** ", attendance_count.get('Absent', 0))
-                if len(attendance_info) > 0:
-                    attendance_percentage = (attendance_count.get('Present', 0) / len(attendance_info)) * 100
-                    st.write(f"**Attendance Percentage:** {attendance_percentage:.2f}%")
-            
-            with col3:
-                st.markdown("### 📈 Grade Information")
-                if not grade_info.empty:
-                    latest_grade = grade_info.iloc[0]
-                    st.write(f"**Total Marks:** {latest_grade['total_marks']}")
-                    st.write(f"**Status:** {latest_grade['status']}")
-                    st.write(f"**Remarks:** {latest_grade['remark']}")
-            
-            # Show detailed attendance record
-            st.markdown("### 📅 Detailed Attendance Record")
-            st.dataframe(attendance_info)
-            
-            # Show student events
-            if not student_events.empty:
-                st.markdown("### 🎭 Student Event Participation")
-                st.dataframe(student_events)
-
-    elif section == "Attendance Overview":
-        st.subheader("📊 Attendance Summary")
-        attendance_summary = attendance_df['status'].value_counts()
-        st.write("✅ Overall Attendance Count")
-        st.bar_chart(attendance_summary)
-
-        # Calculate attendance percentage by student
-        attendance_by_student = attendance_df.groupby('student_id')['status'].apply(
-            lambda x: (x == 'Present').mean() * 100
-        ).reset_index()
-        attendance_by_student.columns = ['Student ID', 'Attendance %']
-        
-        st.subheader("📊 Attendance Percentage by Student")
-        st.bar_chart(attendance_by_student.set_index('Student ID'))
-
-        st.subheader("📆 Full Attendance Table")
-        st.dataframe(attendance_df)
-
-    elif section == "Grades Overview":
-        st.subheader("📈 Total Marks per Student")
-        chart_data = grade_df[['student_id', 'total_marks']]
-        st.bar_chart(chart_data.set_index('student_id'))
-
-        st.markdown("🧮 *Pass/Fail Count*")
-        status_chart = grade_df['status'].value_counts()
-        st.write(status_chart)
-
-        # Calculate average marks
-        avg_marks = grade_df.groupby('student_id')['total_marks'].mean().reset_index()
-        st.subheader("📊 Average Marks by Student")
-        st.bar_chart(avg_marks.set_index('student_id'))
-
-        st.subheader("📄 Full Grade Sheet")
-        st.dataframe(grade_df)
-        
-    elif section == "Event Information":
-        st.subheader("🎭 Student Event Participation Records")
-        
-        # Check if we have event info data
-        if not event_info_df.empty:
-            # Display event information with filtering options
-            st.markdown("### 🔍 Filter Events")
-            
-            # Get unique student IDs and event names for filtering
-            unique_students = sorted(event_info_df['student_id'].unique())
-            unique_events = sorted(event_info_df['event_name'].unique())
-            
-            # Create filters
+                st.info("No event information available. Add events using the '➕ Add Event Info' section.")
+
+        elif section == "➕ Add Event Info":
+            st.subheader("➕ Add New Event Information")
+
+            # Create form for adding new event info
+            with st.form("add_event_form"):
+                # Get list of student IDs
+                student_ids = repo.student_ids()
+
+                # Form fields
+                student_id = st.selectbox("Student ID *", options=student_ids)
+                event_name = st.text_input("Event Name *")
+                event_date = st.date_input("Event Date *", datetime.today())
+                event_location = st.text_input("Event Location")
+                participation_type = st.selectbox(
+                    "Participation Type", 
+                    ["Participant", "Organizer", "Volunteer", "Speaker", "Presenter", "Attendee", "Other"]
+                )
+                achievement = st.text_input("Achievement (if any)")
+
+                # Submit button
+                submit_button = st.form_submit_button("Add Event")
+
+                if submit_button:
+                    if not event_name:
+                        st.error("Event Name is required")
+                    else:
+                        try:
+                            # Store only the new row; the backend assigns the next event ID
+                            repo.add_event({
+                                "student_id": student_id,
+                                "event_name": event_name,
+                                "event_date": event_date.strftime("%Y-%m-%d"),
+                                "event_location": event_location,
+                                "participation_type": participation_type,
+                                "achievement": achievement if achievement else None
+                            })
+
+                            st.success(f"Event added successfully for student {student_id}")
+                        except Exception as e:
+                            st.error(f"Failed to add event: {e}")
+
+        elif section == "📤 Export Data":
+            from exports import EXPORT_FORMATS, EXPORT_SCOPES, exportable_tables, start_export, write_event_summary
+
+            st.subheader("📤 Export Data")
+            st.write("Exports run in the background and are written in chunks, so even the whole cohort can be exported without waiting on this page.")
+
             col1, col2 = st.columns(2)
-            
             with col1:
-                selected_student = st.selectbox("Filter by Student ID", ["All"] + list(unique_students))
-            
+                scope = st.radio("Export for", list(EXPORT_SCOPES), format_func=str.title, horizontal=True)
             with col2:
-                selected_event = st.selectbox("Filter by Event Name", ["All"] + list(unique_events))
-            
-            # Apply filters
-            filtered_df = event_info_df.copy()
-            
-            if selected_student != "All":
-                filtered_df = filtered_df[filtered_df['student_id'] == selected_student]
-            
-            if selected_event != "All":
-                filtered_df = filtered_df[filtered_df['event_name'] == selected_event]
-            
-            # Display filtered data
-            st.dataframe(filtered_df)
-            
-            # Display participation metrics
-            st.markdown("### 📊 Event Participation Metrics")
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("Total Events", len(event_info_df['event_name'].unique()))
-            
-            with col2:
-                st.metric("Total Student Participants", len(event_info_df['student_id'].unique()))
-            
-            with col3:
-                achievements = event_info_df['achievement'].dropna()
-                st.metric("Total Achievements", len(achievements))
-        else:
-            st.info("No event information available. Add events using the '➕ Add Event Info' section.")
-        
-    elif section == "➕ Add Event Info":
-        st.subheader("➕ Add New Event Information")
-        
-        # Create form for adding new event info
-        with st.form("add_event_form"):
-            # Get list of student IDs
-            student_ids = student_df['student_id'].unique()
-            
-            # Form fields
-            student_id = st.selectbox("Student ID *", options=student_ids)
-            event_name = st.text_input("Event Name *")
-            event_date = st.date_input("Event Date *", datetime.today())
-            event_location = st.text_input("Event Location")
-            participation_type = st.selectbox(
-                "Participation Type", 
-                ["Participant", "Organizer", "Volunteer", "Speaker", "Presenter", "Attendee", "Other"]
-            )
-            achievement = st.text_input("Achievement (if any)")
-            
-            # Submit button
-            submit_button = st.form_submit_button("Add Event")
-            
-            if submit_button:
-                if not event_name:
-                    st.error("Event Name is required")
-                else:
-                    try:
-                        # Read existing events
-                        if os.path.exists("EventInfo.csv"):
-                            event_info_df = pd.read_csv("EventInfo.csv")
-                            new_event_id = event_info_df['event_id'].max() + 1 if not event_info_df.empty else 1
-                        else:
-                            event_info_df = pd.DataFrame()
-                            new_event_id = 1
-                        
-                        # Create new event record
-                        new_event = {
-                            "event_id": new_event_id,
-                            "student_id": student_id,
-                            "event_name": event_name,
-                            "event_date": event_date.strftime("%Y-%m-%d"),
-                            "event_location": event_location,
-                            "participation_type": participation_type,
-                            "achievement": achievement if achievement else None
-                        }
-                        
-                        # Append to dataframe and save
-                        event_info_df = pd.concat([event_info_df, pd.DataFrame([new_event])], ignore_index=True)
-                        event_info_df.to_csv("EventInfo.csv", index=False)
-                        
-                        st.success(f"Event added successfully for student {student_id}")
-                    except Exception as e:
-                        st.error(f"Failed to add event: {e}")
+                export_value = None
+                if scope == "student":
+                    export_value = st.selectbox("Student ID", repo.student_ids())
+                elif scope == "course":
+                    export_value = st.selectbox("Course ID", list(repo.grade_summary("course").index))
+
+            tables = exportable_tables(repo, scope)
+            export_tables = st.multiselect("Tables", tables, default=tables)
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS))
+
+            if st.button("Start Export", disabled=not export_tables):
+                job = start_export(repo, export_tables, scope, export_value, export_format)
+                st.session_state.setdefault("export_jobs", []).append(job.id)
+
+            show_export_jobs()
+
+            st.markdown("### 📊 Event Chart Summary")
+            st.write("Writes the participants per event to `event_summary.csv`, which the R event charts read instead of the full event table.")
+            if st.button("Write Event Summary"):
+                try:
+                    st.success(f"Event summary written to {write_event_summary(repo)}")
+                except Exception as e:
+                    st.error(f"Failed to write the event summary: {e}")
+
+    # Hidden admin panel with per-section timings, opened with ?admin=1 when SIS_INSTRUMENT=1
+    if instrumentation.ENABLED and st.query_params.get("admin") == "1":
+        with st.sidebar.expander("⏱️ Timings", expanded=True):
+            st.dataframe(instrumentation.span_summary(), hide_index=True)
+            st.download_button("Prometheus metrics", instrumentation.prometheus_text(), "sis_metrics.prom")
+            st.download_button("Span log (JSON lines)", instrumentation.json_lines(), "sis_spans.jsonl")
+    instrumentation.write_metrics()
 
 else:
-    st.error("🚨 One or more required CSV files (Attendance.csv, Grade.csv, Student_ID_Table.csv) not found in the current directory.") 
\ No newline at end of file
+    if repo.name == "csv":
+        st.error("🚨 One or more required CSV files (Attendance.csv, Grade.csv, Student_ID_Table.csv) not found in the current directory.")
+    else:
+        st.error(f"🚨 Could not read the dashboard tables from the {repo.name} backend.") 
\ No newline at end of file
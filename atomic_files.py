@@ -0,0 +1,20 @@
+import os
+import threading
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_path(path):
+    """Yield a temporary path to write instead of `path`, renamed over it once the block succeeds.
+
+    Readers see either the old or the new complete file. Sessions are
+    threads of one process, so the temporary name is unique per process and
+    thread; it is removed if the block raises.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
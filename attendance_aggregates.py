@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Canonical attendance labels; any other label found in the data is kept after these
+STATUSES = ["Present", "Absent", "Late"]
+
+
+def normalize_status(status):
+    """Return attendance statuses as a categorical with canonical title-case labels.
+
+    Only the distinct labels are cleaned up, so 'present', ' PRESENT' and
+    'Present' all collapse to one category without touching every row.
+    """
+    if not isinstance(status.dtype, pd.CategoricalDtype):
+        status = status.astype("category")
+    labels = status.cat.categories.astype(str).str.strip().str.title()
+    categories = STATUSES + sorted(set(labels) - set(STATUSES))
+    mapping = pd.Index(categories).get_indexer(labels)
+    codes = status.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, mapping[codes] if len(mapping) else codes, -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=status.index, name=status.name)
+
+
+def attendance_counts(df, by=("student_id",), start=None, end=None, date_column="attendance_date",
+                      with_totals=True):
+    """Count every status per group in one vectorized pass.
+
+    Returns one row per group with a column per status and, unless
+    `with_totals` is False, the total number of records and the attendance
+    percentage (share of 'Present' records). `start`/`end` optionally
+    restrict the records to an inclusive date range.
+    """
+    by = list(by)
+    if start is not None or end is not None:
+        dates = pd.to_datetime(df[date_column])
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= (dates >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (dates <= pd.Timestamp(end)).to_numpy()
+        df = df[mask]
+
+    status = normalize_status(df["status"])
+    status_codes = status.cat.codes.to_numpy()
+    categories = list(status.cat.categories)
+
+    if len(by) == 1:
+        group_codes, groups = pd.factorize(df[by[0]], sort=True)
+        groups = pd.Index(groups, name=by[0])
+    else:
+        group_codes, groups = pd.factorize(pd.MultiIndex.from_frame(df[by]), sort=True)
+        groups = pd.MultiIndex.from_tuples(groups, names=by)
+
+    valid = (group_codes >= 0) & (status_codes >= 0)
+    flat = group_codes[valid] * len(categories) + status_codes[valid]
+    counts = np.bincount(flat, minlength=len(groups) * len(categories)).reshape(len(groups), len(categories))
+
+    summary = pd.DataFrame(counts, index=groups, columns=categories)
+    return add_totals(summary) if with_totals else summary
+
+
+def add_totals(counts):
+    """Add the total and attendance percentage columns to per-group status counts"""
+    summary = counts.copy()
+    summary["total"] = counts.to_numpy().sum(axis=1)
+    summary["attendance_pct"] = np.divide(
+        summary["Present"].to_numpy() * 100.0,
+        summary["total"].to_numpy(),
+        out=np.zeros(len(summary)),
+        where=summary["total"].to_numpy() > 0,
+    )
+    return summary
+
+
+def status_totals(summary):
+    """Collapse a per-group summary into overall counts per status"""
+    return summary.drop(columns=["total", "attendance_pct"]).sum()
+
+
+def student_attendance(summary, student_id):
+    """Return one student's row from a per-student summary, or zeros if they have no records"""
+    if student_id in summary.index:
+        return summary.loc[student_id]
+    return pd.Series(0, index=summary.columns, dtype=float)
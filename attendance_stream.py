@@ -0,0 +1,364 @@
+import csv
+import hashlib
+import io
+import os
+import pickle
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from atomic_files import atomic_path
+from attendance_aggregates import STATUSES, add_totals, attendance_counts
+from data_loader import file_signature
+from instrumentation import span
+from schemas import apply_schema, table_schema
+
+# Bytes of CSV parsed per step; this bounds peak memory whatever the file size
+BLOCK_BYTES = 16 * 1024 * 1024
+
+# Streaming state is persisted next to its source CSV in this folder
+STREAM_DIR = ".rollups"
+
+# Columns folded into the aggregates; everything else is skipped while parsing
+STREAM_KEYS = ["student_id", "course_id"]
+
+# Bytes between the row checkpoints that let one page of the log be read
+# without parsing the rest; scans also hold one such piece at a time
+CHECKPOINT_BYTES = 1024 * 1024
+
+# Filtered row sets (e.g. one course's records) kept per log version
+_MAX_MATCHES = 16
+
+# Persisted streaming state; a stored state missing any of these is discarded
+STATE_FIELDS = ("signature", "offset", "header", "fingerprint", "counts", "checkpoints", "students", "pending")
+
+_NO_ROWS = (np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+
+
+class AttendanceLog:
+    """The complete rows of an attendance log as of one refresh, read a window at a time.
+
+    Rows appended later are not part of the log, so its pages never shift.
+    A page is parsed from the nearest checkpoints and scans parse the file
+    one checkpoint piece at a time, so memory does not grow with the file.
+    One student's rows are read directly from the byte offsets recorded for
+    them while folding, so a lookup does not depend on the size of the log.
+    """
+
+    def __init__(self, path, header, checkpoints, students=None):
+        self.path = path
+        self.columns = list(header or [])
+        self.checkpoints = tuple(checkpoints)
+        self.students = students or {}
+        self.rows = self.checkpoints[-1][0] if self.checkpoints else 0
+        self._starts = [row for row, _ in self.checkpoints]
+        # Categories would differ from piece to piece, so those columns stay as parsed
+        self._schema = {column: dtype for column, dtype in table_schema(path).items() if dtype != "category"}
+        self._matches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.rows
+
+    def _parse(self, file, first, last):
+        """Parse the rows between two checkpoints, indexed by their row numbers"""
+        (start_row, start), (_, stop) = self.checkpoints[first], self.checkpoints[last]
+        file.seek(start)
+        df = self._frame(file.read(stop - start))
+        df.index = pd.RangeIndex(start_row, start_row + len(df))
+        return df
+
+    def _frame(self, data):
+        """Parse CSV rows (without the header) into a frame with the log's columns and types"""
+        if not data:
+            return pd.DataFrame(columns=self.columns)
+        df = pd.read_csv(io.BytesIO(data), names=self.columns, header=None, skip_blank_lines=False)
+        return apply_schema(df, self._schema)
+
+    def student_rows(self, student_id):
+        """Return one student's rows, read line by line from their recorded byte offsets"""
+        rows, offsets = self.students.get(student_id, _NO_ROWS)
+        lines = []
+        with open(self.path, "rb") as file:
+            for offset in offsets.tolist():
+                file.seek(offset)
+                line = file.readline()
+                lines.append(line if line.endswith(b"\n") else line + b"\n")
+        df = self._frame(b"".join(lines))
+        df.index = pd.Index(rows)
+        return df
+
+    def read(self, start, stop):
+        """Return rows `start` to `stop` (exclusive) of the log"""
+        stop = min(stop, self.rows)
+        if start >= stop:
+            return pd.DataFrame(columns=self.columns)
+        first, last = bisect_right(self._starts, start) - 1, bisect_left(self._starts, stop)
+        with open(self.path, "rb") as file:
+            return self._parse(file, first, last).loc[start:stop - 1]
+
+    def pieces(self):
+        """Yield the log one checkpoint piece at a time (a single empty frame if it has no rows)"""
+        if not self.rows:
+            yield pd.DataFrame(columns=self.columns)
+            return
+        with open(self.path, "rb") as file:
+            for number in range(len(self.checkpoints) - 1):
+                yield self._parse(file, number, number + 1)
+
+    def matching(self, where):
+        """Return the rows equal to every value in `where`.
+
+        A filter on one student reads just that student's rows; any other
+        filter scans the log once and is kept per log version.
+        """
+        if "student_id" in where:
+            rows = self.student_rows(where["student_id"])
+            others = [rows[column] == value for column, value in where.items() if column != "student_id"]
+            return rows[np.logical_and.reduce(others)] if others else rows
+        key = tuple(sorted(where.items()))
+        with self._lock:
+            if key in self._matches:
+                self._matches.move_to_end(key)
+                return self._matches[key]
+        matches = pd.concat([
+            piece[np.logical_and.reduce([piece[column] == value for column, value in where.items()])]
+            for piece in self.pieces()
+        ])
+        with self._lock:
+            self._matches[key] = matches
+            if len(self._matches) > _MAX_MATCHES:
+                self._matches.popitem(last=False)
+        return matches
+
+
+class AttendanceStream:
+    """Per-student, per-course status counts folded from an attendance log.
+
+    The log is parsed in bounded blocks and only the resulting counts are
+    kept. The byte offset after the last complete row is persisted with a
+    hash of every byte before it, so a refresh after rows are appended reads
+    just the new bytes, and an edit to earlier rows starts over. The byte
+    offset of each student's rows is recorded along the way for lookups.
+
+    A last row without a line break is folded once it has every column, or
+    once the file has not changed between two refreshes; until then it may
+    still be being written. If a folded row is later written out further,
+    the stream starts over.
+    """
+
+    def __init__(self, path, block_bytes=BLOCK_BYTES):
+        self.path = path
+        self.block_bytes = block_bytes
+        directory, filename = os.path.split(os.path.abspath(path))
+        self.store_path = os.path.join(directory, STREAM_DIR, os.path.splitext(filename)[0] + ".stream.pkl")
+        self._reset()
+        self._summaries = {}
+        self._log = None
+        self._load()
+
+    def _reset(self):
+        self.signature = None
+        self.offset = 0
+        self.header = None
+        self.fingerprint = None
+        self.counts = None
+        self.checkpoints = []
+        self.students = {}
+        self.pending = False
+
+    def _load(self):
+        if os.path.exists(self.store_path):
+            try:
+                with open(self.store_path, "rb") as file:
+                    state = pickle.load(file)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                return
+            if set(STATE_FIELDS) <= set(state):
+                self.__dict__.update(state)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+        state = {name: getattr(self, name) for name in STATE_FIELDS}
+        with atomic_path(self.store_path) as temp_path, open(temp_path, "wb") as file:
+            pickle.dump(state, file)
+
+    def _fold(self, block):
+        """Parse one block of complete rows, add its counts to the running totals and index its students"""
+        chunk = pd.read_csv(
+            io.BytesIO(block), names=self.header, header=None, skip_blank_lines=False,
+            usecols=STREAM_KEYS + ["status"], dtype={"status": "category"}
+        )
+        if chunk.empty:
+            return
+        first_row = self.checkpoints[-1][0]
+        line_starts = np.concatenate([[0], np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n")) + 1])
+        for student_id, positions in chunk.groupby("student_id").indices.items():
+            rows, offsets = self.students.get(student_id, _NO_ROWS)
+            self.students[student_id] = (np.concatenate([rows, first_row + positions]),
+                                         np.concatenate([offsets, self.offset + line_starts[positions]]))
+        counts = attendance_counts(chunk, by=STREAM_KEYS, with_totals=False)
+        if self.counts is not None:
+            counts = self.counts.add(counts, fill_value=0)
+        columns = [status for status in STATUSES if status in counts] + sorted(set(counts) - set(STATUSES))
+        self.counts = counts[columns].astype("int64")
+
+    def _verify(self, file, end):
+        """Return a hash of the bytes folded so far, or None if they have changed since"""
+        if self.fingerprint is None or end < self.offset:
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        file.seek(0)
+        remaining = self.offset
+        while remaining:
+            block = file.read(min(self.block_bytes, remaining))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+        return digest if digest.hexdigest() == self.fingerprint else None
+
+    def _add_checkpoints(self, block):
+        """Record (row number, byte offset) boundaries about every CHECKPOINT_BYTES through a folded block"""
+        rows = self.checkpoints[-1][0]
+        start = 0
+        while start < len(block):
+            cut = block.find(b"\n", start + CHECKPOINT_BYTES - 1) + 1 or len(block)
+            # A last row without a line break counts too
+            rows += block.count(b"\n", start, cut) + (cut == len(block) and not block.endswith(b"\n"))
+            checkpoint = (rows, self.offset + cut)
+            if len(self.checkpoints) > 1 and checkpoint[1] - self.checkpoints[-2][1] < CHECKPOINT_BYTES:
+                # Too close to the previous boundary (e.g. a few appended rows); extend the last piece
+                self.checkpoints[-1] = checkpoint
+            else:
+                self.checkpoints.append(checkpoint)
+            start = cut
+
+    def _missing_columns(self, row):
+        """Return how many columns a last row without a line break does not have yet"""
+        fields = next(csv.reader([row.decode("utf-8", "replace")]), [])
+        return max(len(self.header) - len(fields), 0)
+
+    def _resume(self, file, end):
+        """Return the line break a folded last row got since (b"" if none), or None if it was written out further"""
+        if self.offset == end:
+            return b""
+        file.seek(self.offset - 1)
+        if file.read(1) in (b"\n", b"\r"):
+            return b""
+        ending = file.readline()
+        if ending.strip(b"\r\n"):
+            return None
+        if not ending.endswith(b"\n"):
+            return b""
+        # The line break belongs to the row, so it joins the last piece
+        self.offset += len(ending)
+        self.checkpoints[-1] = (self.checkpoints[-1][0], self.offset)
+        return ending
+
+    def refresh(self):
+        """Fold every complete row appended since the last refresh"""
+        signature = file_signature(self.path)
+        settled = signature == self.signature
+        if settled and not self.pending:
+            return self
+
+        with span("attendance_stream.refresh", file=os.path.basename(self.path)), open(self.path, "rb") as file:
+            end = os.fstat(file.fileno()).st_size
+            digest = self._verify(file, end)
+            ending = self._resume(file, end) if digest is not None else None
+            if ending is None:
+                # The file was truncated, replaced or edited, so start over
+                self._reset()
+                digest = hashlib.blake2b(digest_size=16)
+            else:
+                digest.update(ending)
+
+            if self.offset == 0:
+                file.seek(0)
+                header_line = file.readline()
+                if not header_line.endswith(b"\n"):
+                    # Not even the header is complete yet
+                    return self
+                self.header = next(csv.reader([header_line.decode("utf-8-sig")]))
+                self.offset = len(header_line)
+                self.checkpoints = [(0, self.offset)]
+                digest.update(header_line)
+
+            self.pending = False
+            file.seek(self.offset)
+            while self.offset < end:
+                block = file.read(min(self.block_bytes, end - self.offset))
+                # Fold up to the last complete row; the remainder is read with the next block
+                cut = block.rfind(b"\n") + 1
+                if cut:
+                    block = block[:cut]
+                elif self.offset + len(block) < end:
+                    # A row longer than a block: read on to its end
+                    block += file.readline()
+                missing = 0 if block.endswith(b"\n") else self._missing_columns(block)
+                if missing and not settled:
+                    # The last row may still be being written
+                    self.pending = True
+                    break
+                file.seek(self.offset + len(block))
+                # A short last row left as it is parses with its missing columns empty
+                self._fold(block + b"," * missing)
+                self._add_checkpoints(block)
+                digest.update(block)
+                self.offset += len(block)
+
+            self.fingerprint = digest.hexdigest()
+
+        self.signature = signature
+        self._summaries = {}
+        self._log = None
+        self._save()
+        return self
+
+    def log(self):
+        """Return the rows folded so far as a log that can be read a window at a time"""
+        if self._log is None:
+            self._log = AttendanceLog(self.path, self.header, self.checkpoints, dict(self.students))
+        return self._log
+
+    def summary(self, by=("student_id",)):
+        """Return status counts, totals and attendance percentage per group of `by`"""
+        by = tuple(by)
+        if by not in self._summaries:
+            if self.counts is None:
+                counts = pd.DataFrame(0, index=pd.Index([], name=by[0]), columns=STATUSES)
+            else:
+                counts = self.counts.groupby(level=list(by)).sum()
+            self._summaries[by] = add_totals(counts)
+        return self._summaries[by]
+
+
+_streams = {}
+_lock = threading.Lock()
+
+
+def get_attendance_stream(path):
+    """Return the shared stream for an attendance log, caught up with the file"""
+    key = os.path.abspath(path)
+    with _lock:
+        if key not in _streams:
+            _streams[key] = AttendanceStream(path)
+        return _streams[key].refresh()
+
+
+def get_attendance_summary(path, by=("student_id",)):
+    """Return the per-group attendance summary that every dashboard view shares"""
+    return get_attendance_stream(path).summary(by)
+
+
+def get_attendance_log(path):
+    """Return the complete rows of an attendance log, caught up with the file"""
+    key = os.path.abspath(path)
+    with _lock:
+        if key not in _streams:
+            _streams[key] = AttendanceStream(path)
+        return _streams[key].refresh().log()
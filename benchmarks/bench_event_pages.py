@@ -0,0 +1,74 @@
+"""Compare keyset pages from iter_events with OFFSET pages and with get_all_events.
+
+Usage: python benchmarks/bench_event_pages.py [events ...]
+
+Runs against a temporary SQLite stand-in (DB_SQLITE_PATH) holding synthetic
+events. Prints the latency of a page at increasing depths and the peak
+Python memory of walking every event versus loading them all at once.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from repository import SqliteRepository
+from synthetic_data import EVENTS_PER_STUDENT, generate_dataset
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+PAGE_SIZE = 1000
+DEPTHS = [0.0, 0.5, 0.99]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main(sizes):
+    # db_operations reads DB_SQLITE_PATH when it is imported
+    directory = tempfile.TemporaryDirectory()
+    os.environ["DB_SQLITE_PATH"] = os.path.join(directory.name, "bench.db")
+    import db_operations
+
+    print(f"{'events':>10} {'depth':>6} {'keyset ms':>10} {'offset ms':>10}")
+    for events in sizes:
+        generate_dataset(directory.name, students=events // EVENTS_PER_STUDENT, days=1)
+        SqliteRepository(db_operations.SQLITE_PATH).import_csvs(directory.name)
+        with sqlite3.connect(db_operations.SQLITE_PATH) as connection:
+            connection.execute("DROP TABLE IF EXISTS Student")
+            connection.execute("CREATE TABLE Student AS SELECT student_id FROM Student_ID_Table")
+            keys = pd.read_sql("SELECT event_date, event_id FROM EventInfo ORDER BY event_date DESC, event_id DESC",
+                               connection)
+
+        for depth in DEPTHS:
+            offset = int(len(keys) * depth)
+            after = None if offset == 0 else tuple(keys.iloc[offset - 1])
+            after = after and (after[0], int(after[1]))
+            keyset_ms, _ = timed(lambda: next(db_operations.iter_events(PAGE_SIZE, after=after)))
+            offset_query = db_operations.EVENT_PAGE_QUERY.format(where="") + f" OFFSET {offset}"
+            with sqlite3.connect(db_operations.SQLITE_PATH) as connection:
+                offset_ms, _ = timed(lambda: connection.execute(db_operations.sql(offset_query), (PAGE_SIZE,)).fetchall())
+            print(f"{events:>10,} {depth:>6.0%} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+
+        walk_mb = peak_memory(lambda: sum(len(page) for page in db_operations.iter_events(PAGE_SIZE)))
+        load_mb = peak_memory(db_operations.get_all_events)
+        print(f"{events:>10,} peak MB: walk {walk_mb:.1f}, get_all_events {load_mb:.1f}")
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,58 @@
+"""Measure event insert throughput with many concurrent writers.
+
+Each writer is a separate process, like separate dashboard servers sharing
+one EventInfo.csv. The run fails if any event is lost or an ID is reused.
+
+Usage: python benchmarks/bench_event_store.py [writers] [events_per_writer]
+"""
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from event_store import add_event, add_events, compact_events
+
+
+def submit_events(args):
+    path, writer, count = args
+    for i in range(count):
+        add_event({
+            "student_id": 7001 + writer,
+            "event_name": f"Benchmark Event {i}",
+            "event_date": "2024-01-01",
+            "event_location": "Campus",
+            "participation_type": "Participant",
+        }, path)
+    return count
+
+
+def main(writers=50, events_per_writer=40):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "EventInfo.csv")
+
+        start = time.perf_counter()
+        with Pool(writers) as pool:
+            total = sum(pool.map(submit_events, [(path, writer, events_per_writer) for writer in range(writers)]))
+        elapsed = time.perf_counter() - start
+        print(f"{writers} writers: {total} single inserts in {elapsed:.2f}s ({total / elapsed:,.0f} events/s)")
+
+        batch = [{"student_id": 7001, "event_name": "Bulk Import", "event_date": "2024-01-02"}] * 10_000
+        start = time.perf_counter()
+        add_events(batch, path)
+        elapsed = time.perf_counter() - start
+        print(f"batch insert: {len(batch)} events in {elapsed:.2f}s ({len(batch) / elapsed:,.0f} events/s)")
+
+        compact_events(path)
+        event_ids = pd.read_csv(path)["event_id"]
+        expected = total + len(batch)
+        assert len(event_ids) == expected, f"expected {expected} events, found {len(event_ids)}"
+        assert event_ids.is_unique, "duplicate event IDs"
+        print(f"verified {expected} events with unique IDs")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
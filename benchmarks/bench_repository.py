@@ -0,0 +1,68 @@
+"""Time the dashboard's queries against each storage backend on the same synthetic data.
+
+Usage: python benchmarks/bench_repository.py [rows ...]
+
+The csv and sqlite backends always run; set SIS_BENCH_MYSQL=1 to include the
+MySQL backend, which must already hold the same tables (e.g. loaded with
+db_operations.bulk_load_csv).
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from repository import CsvRepository, MySqlRepository, SqliteRepository
+from synthetic_data import COURSES_PER_STUDENT, FIRST_STUDENT_ID, generate_dataset
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DAYS = 50
+REPEATS = 5
+
+
+def write_tables(directory, rows):
+    """Write a synthetic dataset with about `rows` attendance rows and return its student IDs"""
+    students = max(rows // (COURSES_PER_STUDENT * DAYS), 1)
+    generate_dataset(directory, students=students, courses=20, days=DAYS)
+    return FIRST_STUDENT_ID + np.arange(students)
+
+
+def workload(repository, student_ids):
+    """The queries one pass through the dashboard's sections issues"""
+    return {
+        "student lookup": lambda: [repository.student_records("attendance", student) for student in student_ids],
+        "attendance summary": lambda: repository.attendance_summary(),
+        "grade summary": lambda: repository.grade_summary("course"),
+        "event filter": lambda: repository.table_page("events", 0, 50, where={"event_name": "Hackathon 2024"}),
+        "filtered page": lambda: repository.table_page("attendance", 500, 50, sort_column="course_id",
+                                                       filter_column="status", filter_text="abs"),
+    }
+
+
+def time_call(function):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        function()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'backend':>8} " + " ".join(f"{name:>18}" for name in workload(None, [])))
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            students = write_tables(directory, rows)
+            lookups = np.random.default_rng(1).choice(students, 20)
+            sqlite = SqliteRepository(os.path.join(directory, "bench.db"))
+            sqlite.import_csvs(directory)
+            repositories = [CsvRepository(directory), sqlite]
+            if os.environ.get("SIS_BENCH_MYSQL"):
+                repositories.append(MySqlRepository())
+            for repository in repositories:
+                timings = [time_call(query) for query in workload(repository, lookups).values()]
+                print(f"{rows:>10,} {repository.name:>8} " + " ".join(f"{ms:>15.2f} ms" for ms in timings))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
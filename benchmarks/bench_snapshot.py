@@ -0,0 +1,76 @@
+"""Measure dashboard memory as concurrent sessions grow, with and without the shared snapshot.
+
+Usage: python benchmarks/bench_snapshot.py [sessions ...]
+
+Each simulated session runs one pass over the dashboard's views from its own
+thread and keeps its data alive, as an open Streamlit session does. The
+"copies" column is the old behaviour of every session reading its own frames.
+"""
+import os
+import sys
+import tempfile
+import threading
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_loader import clear_cache
+from repository import TABLES, CsvRepository
+from snapshot import SnapshotManager
+from synthetic_data import generate_dataset
+
+DEFAULT_SESSIONS = [1, 10, 50, 200]
+STUDENTS = 1_000
+# Beyond this many sessions the per-session copies take too long (and too much memory) to measure
+MAX_COPYING_SESSIONS = 50
+
+
+def shared_session(repository, student_id, held):
+    pinned = repository.pinned()
+    pinned.student_records("attendance", student_id)
+    pinned.table_page("attendance", 0, 50, sort_column="course_id")
+    pinned.event_options()
+    held.append(pinned)
+
+
+def copying_session(directory, student_id, held):
+    frames = {table: pd.read_csv(os.path.join(directory, name + ".csv")) for table, (name, _) in TABLES.items()}
+    attendance = frames["attendance"]
+    attendance[attendance["student_id"] == student_id]
+    attendance.sort_values("course_id").head(50)
+    held.append(frames)
+
+
+def memory_mb(session, sessions, *args):
+    """Return (peak, still held once every session has finished its pass) in MB"""
+    held = []
+    tracemalloc.start()
+    threads = [threading.Thread(target=session, args=(*args, 7001 + number, held)) for number in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    held_bytes, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, held_bytes / 1024 / 1024
+
+
+def main(session_counts):
+    with tempfile.TemporaryDirectory() as directory:
+        generate_dataset(directory, students=STUDENTS, days=50)
+        print(f"{'sessions':>9} {'snapshot peak/held MB':>22} {'copies peak/held MB':>20}")
+        for sessions in session_counts:
+            # Start from empty caches each time, as after a restart, so the first session pays for loading
+            clear_cache()
+            repository = CsvRepository(directory)
+            repository.snapshots = SnapshotManager(repository.snapshots.sources)
+            shared = "{:.1f} / {:.1f}".format(*memory_mb(shared_session, sessions, repository))
+            copies = "-"
+            if sessions <= MAX_COPYING_SESSIONS:
+                copies = "{:.1f} / {:.1f}".format(*memory_mb(copying_session, sessions, directory))
+            print(f"{sessions:>9} {shared:>22} {copies:>20}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SESSIONS)
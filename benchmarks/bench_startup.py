@@ -0,0 +1,96 @@
+"""Measure the dashboard's time to first render and its rerun time.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--reruns 10] [--output startup.json]
+                                       [--compare baseline.json] [--threshold 1.25]
+
+Each run starts a fresh Python process, as `streamlit run` does, imports
+Streamlit ("import") and renders an empty script once so the test harness's
+own setup is not counted. "first_render" is then the first run of app.py,
+which pays for importing the app's modules, one-time initialization, loading
+the data and decoding the banner; "new_session" is the next visitor's first
+run in the same process and "rerun" a later run of one session, as after
+every widget interaction. Medians over the runs are printed and, with
+--output, saved in the same JSON layout as run_benchmarks.py so --compare
+reports regressions the same way.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from run_benchmarks import compare
+
+# Run in a child process so every measurement starts with nothing imported
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+AppTest.from_string("import streamlit as st").run()
+ready = time.perf_counter()
+AppTest.from_file(sys.argv[1], default_timeout=300).run()
+rendered = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+app.run()
+session = time.perf_counter()
+reruns = []
+for _ in range(int(sys.argv[2])):
+    rerun_start = time.perf_counter()
+    app.run()
+    reruns.append((time.perf_counter() - rerun_start) * 1000)
+if app.exception:
+    sys.exit(app.exception[0].message)
+print(json.dumps({"import": (imported - start) * 1000, "first_render": (rendered - ready) * 1000,
+                  "new_session": (session - rendered) * 1000, "rerun": reruns}))
+"""
+
+
+def measure(runs, reruns):
+    """Return ({step: median cold ms}, {step: median warm ms}) over `runs` fresh processes"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", CHILD, os.path.join(ROOT, "app.py"), str(reruns)],
+                                cwd=ROOT, capture_output=True, text=True)
+        if result.returncode:
+            raise SystemExit(f"app.py failed to render: {result.stderr.strip().splitlines()[-1:]}")
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    cold = {step: float(np.median([sample[step] for sample in samples]))
+            for step in ("import", "first_render", "new_session")}
+    warm = {"rerun": float(np.median([ms for sample in samples for ms in sample["rerun"]]))}
+    return cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to start")
+    parser.add_argument("--reruns", type=int, default=10, help="reruns timed in each process")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    cold, warm = measure(args.runs, args.reruns)
+    results = {"scales": {"startup": {"cold_ms": cold, "warm_ms": warm}}}
+    for step, ms in {**cold, **warm}.items():
+        print(f"{step:>14} {ms:>10.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for _, kind, step, old_ms, new_ms in regressions:
+            print(f"REGRESSION {step} ({kind[:-3]}): {old_ms:.1f} ms -> {new_ms:.1f} ms")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Compare per-student lookups through StudentIndex with full boolean scans.
+
+Usage: python benchmarks/bench_student_index.py [rows ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from student_index import StudentIndex
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+ROWS_PER_STUDENT = 200
+LOOKUPS = 200
+
+
+def make_attendance(rows):
+    """Build a synthetic attendance log with ROWS_PER_STUDENT rows per student"""
+    students = max(rows // ROWS_PER_STUDENT, 1)
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "attendance_id": np.arange(1, rows + 1),
+        "student_id": rng.integers(7001, 7001 + students, rows),
+        "status": pd.Categorical.from_codes(rng.integers(0, 2, rows), ["Absent", "Present"]),
+    })
+
+
+def time_lookups(lookup, student_ids):
+    start = time.perf_counter()
+    for student_id in student_ids:
+        lookup(student_id)
+    return (time.perf_counter() - start) / len(student_ids) * 1000
+
+
+def main(sizes):
+    print(f"{'rows':>12} {'build ms':>10} {'index ms':>10} {'scan ms':>10}")
+    for rows in sizes:
+        df = make_attendance(rows)
+        student_ids = np.random.default_rng(1).choice(df["student_id"].unique(), LOOKUPS)
+
+        start = time.perf_counter()
+        index = StudentIndex(df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        index_ms = time_lookups(index.rows, student_ids)
+        scan_ms = time_lookups(lambda student_id: df[df["student_id"] == student_id], student_ids[:20])
+        print(f"{rows:>12,} {build_ms:>10.1f} {index_ms:>10.3f} {scan_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
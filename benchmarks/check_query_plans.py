@@ -0,0 +1,119 @@
+"""Fail if any hot dashboard query falls back to a full table scan or a sort.
+
+Usage: SIS_BACKEND=sqlite|mysql python benchmarks/check_query_plans.py [student_id]
+
+Runs EXPLAIN for each query the dashboard issues against the configured SQL
+backend (after `python migrations.py`), prints the plans and exits with
+status 1 if any query fails, or if its plan reads a whole table without an
+index or sorts through a filesort or temporary table. Run it against a
+database with realistic row counts: on a handful of rows MySQL may rightly
+prefer a table scan.
+"""
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_operations import (ALL_EVENTS_QUERY, EVENT_KEYSET_CONDITION, EVENT_PAGE_QUERY, EVENT_PAGE_SIZE,
+                           STUDENT_EVENTS_QUERY)
+from repository import TABLES, SqlRepository, get_repository
+
+# SQLite plan lines for a table scan without an index, and for a sort step
+SQLITE_FULL_SCAN = re.compile(r"^SCAN \w+$")
+SQLITE_SORT = "USE TEMP B-TREE"
+
+# MySQL access type of a full table scan, and Extra notes for a sort step
+MYSQL_FULL_SCAN = "ALL"
+MYSQL_SORT = ("Using filesort", "Using temporary")
+
+
+def hot_queries(repository, student_id):
+    """Capture the SQL the dashboard's sections send, plus the db_operations event listings"""
+    queries = {
+        "get_all_events": (ALL_EVENTS_QUERY, ()),
+        "get_student_events": (STUDENT_EVENTS_QUERY, (student_id,)),
+        "iter_events page": (
+            EVENT_PAGE_QUERY.format(where=f"WHERE {EVENT_KEYSET_CONDITION}"),
+            ("2024-01-01", "2024-01-01", 1, EVENT_PAGE_SIZE),
+        ),
+        "iter_events student page": (
+            EVENT_PAGE_QUERY.format(where=f"WHERE e.student_id = %s AND {EVENT_KEYSET_CONDITION}"),
+            (student_id, "2024-01-01", "2024-01-01", 1, EVENT_PAGE_SIZE),
+        ),
+        "iter_events name page": (
+            EVENT_PAGE_QUERY.format(where=f"WHERE e.event_name = %s AND {EVENT_KEYSET_CONDITION}"),
+            ("", "2024-01-01", "2024-01-01", 1, EVENT_PAGE_SIZE),
+        ),
+    }
+    calls = {
+        "student attendance": lambda: repository.student_records("attendance", student_id),
+        "student grades": lambda: repository.student_records("grades", student_id),
+        "student events": lambda: repository.student_records("events", student_id),
+        "student attendance summary": lambda: repository.attendance_summary(student_id),
+        "attendance summary": lambda: repository.attendance_summary(),
+        "grade summary by student": lambda: repository.grade_summary("student"),
+        "grade summary by course": lambda: repository.grade_summary("course"),
+        "event options": lambda: repository.event_options(),
+        "event name filter": lambda: repository.table_page("events", 0, 50, where={"event_name": ""}),
+    }
+    captured = []
+
+    def recording_query(query, params=()):
+        captured.append((query, tuple(params)))
+        return SqlRepository._query(repository, query, params)
+
+    repository._query = recording_query
+    try:
+        for table in TABLES:
+            # Column lists are cached after the first probe, which is not a dashboard query
+            repository.table_columns(table)
+        for name, call in calls.items():
+            captured.clear()
+            call()
+            for number, query in enumerate(captured, 1):
+                queries[name if len(captured) == 1 else f"{name} #{number}"] = query
+    finally:
+        del repository._query
+    return queries
+
+
+def plan_problems(repository, plan):
+    """Return the full scans and sorts found in one EXPLAIN result"""
+    if repository.name == "sqlite":
+        details = plan["detail"].tolist()
+        return ([detail for detail in details if SQLITE_FULL_SCAN.match(detail)]
+                + [detail for detail in details if SQLITE_SORT in detail])
+    problems = []
+    for row in plan.to_dict("records"):
+        extra = row.get("Extra") or ""
+        if row.get("type") == MYSQL_FULL_SCAN:
+            problems.append(f"full scan of {row.get('table')}")
+        problems.extend(f"{note} on {row.get('table')}" for note in MYSQL_SORT if note in extra)
+    return problems
+
+
+def main(student_id):
+    repository = get_repository()
+    if not isinstance(repository, SqlRepository):
+        sys.exit("Query plans are checked on the sqlite and mysql backends; set SIS_BACKEND")
+
+    failures = 0
+    for name, (query, params) in hot_queries(repository, student_id).items():
+        try:
+            plan = repository.explain(query, params)
+        except Exception as e:
+            # A query that cannot be planned would fail on the dashboard too
+            failures += 1
+            print(f"ERR  {name}: {e}")
+            continue
+        problems = plan_problems(repository, plan)
+        failures += bool(problems)
+        print(f"{'FAIL' if problems else 'ok  '} {name}")
+        for problem in problems:
+            print(f"       {problem}")
+    print(f"{failures} of the hot queries fail, or scan or sort without an index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 7001))
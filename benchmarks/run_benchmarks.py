@@ -0,0 +1,213 @@
+"""Time the data work behind every dashboard section across dataset sizes and save it as JSON.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--scales tiny small medium] [--output results.json]
+                                        [--compare baseline.json] [--threshold 1.25]
+
+For each scale a synthetic dataset is generated (see synthetic_data.py) and
+the CSV repository's work for each section is timed from cold caches: load,
+search, attendance rollup, grade rollup, event filter and event insert. With
+--compare, timings are checked against an earlier results file and the
+script exits with status 1 if any step got slower than the threshold ratio.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import attendance_stream
+import grade_rollups
+import table_view
+from columnar_store import COLUMNAR_DIR
+from data_loader import clear_cache
+from parallel_loader import load_tables
+from repository import CsvRepository
+from snapshot import SnapshotManager
+from synthetic_data import SCALES, generate_dataset
+
+SEARCHES = 50
+EVENT_INSERTS = 20
+REPEATS = 3
+
+
+def _timed(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def _fresh_repository(directory):
+    """A repository with empty caches, as right after the dashboard first starts on the data"""
+    clear_cache()
+    with attendance_stream._lock:
+        attendance_stream._streams.clear()
+    with grade_rollups._lock:
+        grade_rollups._rollups.clear()
+    table_view._sort_orders.clear()
+    # The columnar copies, attendance checkpoints and grade rollups kept on disk
+    derived = {COLUMNAR_DIR, attendance_stream.STREAM_DIR, grade_rollups.ROLLUP_DIR}
+    for folder, names, _ in os.walk(directory):
+        for name in derived.intersection(names):
+            shutil.rmtree(os.path.join(folder, name))
+            names.remove(name)
+    repository = CsvRepository(directory)
+    repository.snapshots = SnapshotManager(repository.snapshots.sources)
+    return repository
+
+
+def section_work(directory, rng):
+    """Return (pin, {step: function}) for each dashboard section's data work, on fresh caches.
+
+    `pin` loads and pins the snapshot without catching up the attendance
+    log or probing columns as "load" does; every other step reads the
+    snapshot it pins, so the first step to read attendance folds the log.
+    """
+    repository = _fresh_repository(directory)
+    state = {}
+    student_ids = rng.choice(pd.read_csv(os.path.join(directory, "Student_ID_Table.csv"))["student_id"], SEARCHES)
+
+    def pin():
+        state["pinned"] = CsvRepository(directory, repository.snapshots.current())
+
+    def load():
+        state["pinned"] = repository.pinned()
+        for table in ("students", "attendance", "grades", "events"):
+            state["pinned"].table_columns(table)
+
+    def search():
+        pinned = state["pinned"]
+        for student_id in student_ids:
+            for table in ("students", "attendance", "grades", "events"):
+                pinned.student_records(table, student_id)
+            pinned.attendance_summary(student_id)
+
+    def attendance_rollup():
+        summary = state["pinned"].attendance_summary()
+        summary.drop(columns=["total", "attendance_pct"]).sum()
+
+    def grade_rollup():
+        pinned = state["pinned"]
+        pinned.grade_summary("student")
+        pinned.grade_summary("course")
+        pinned.grade_status_counts()
+
+    def event_filter():
+        pinned = state["pinned"]
+        students, events = pinned.event_options()
+        pinned.event_metrics()
+        pinned.table_page("events", 0, 50, where={"student_id": students[0]})
+        pinned.table_page("events", 0, 50, where={"event_name": events[0]})
+        pinned.table_page("events", 0, 50, where={"student_id": students[0], "event_name": events[0]})
+
+    def event_insert():
+        for number in range(EVENT_INSERTS):
+            repository.add_event({
+                "student_id": int(student_ids[number % len(student_ids)]), "event_name": "Benchmark Event",
+                "event_date": "2024-06-01", "event_location": "Campus", "participation_type": "Participant",
+                "achievement": None,
+            })
+        repository.pinned().event_metrics()
+
+    return pin, {
+        "load": load,
+        "load_related_tables": lambda: load_tables(os.path.join(directory, "data")),
+        "search": search,
+        "attendance_rollup": attendance_rollup,
+        "grade_rollup": grade_rollup,
+        "event_filter": event_filter,
+        "event_insert": event_insert,
+    }
+
+
+def run_scale(scale):
+    """Generate one scale's dataset and return its row counts and per-step timings.
+
+    Each step is timed cold (first run after the dashboard starts, with
+    every cache emptied and only the snapshot pinned before it) and warm
+    (the median of REPEATS later runs, served from the caches).
+    """
+    cold, warm = {}, {}
+    with tempfile.TemporaryDirectory() as directory:
+        rows = generate_dataset(directory, **SCALES[scale])
+        for name in list(section_work(directory, np.random.default_rng(0))[1]):
+            pin, steps = section_work(directory, np.random.default_rng(0))
+            if name != "load":
+                pin()
+            cold[name] = _timed(steps[name])
+            warm[name] = float(np.median([_timed(steps[name]) for _ in range(REPEATS)]))
+    return {"rows": rows, "cold_ms": cold, "warm_ms": warm}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Return (scale, kind, step, old ms, new ms) for every step slower than `threshold` times the baseline"""
+    regressions = []
+    for scale, result in results["scales"].items():
+        old = baseline["scales"].get(scale)
+        if old is None:
+            continue
+        for kind in ("cold_ms", "warm_ms"):
+            for step, new_ms in result[kind].items():
+                old_ms = old[kind].get(step)
+                if old_ms and new_ms > old_ms * threshold:
+                    regressions.append((scale, kind, step, old_ms, new_ms))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", default=["tiny", "small"], choices=list(SCALES))
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results",
+                                                         datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"))
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "scales": {},
+    }
+    print(f"{'scale':>8} {'step':>20} {'cold ms':>10} {'warm ms':>10}")
+    for scale in args.scales:
+        result = results["scales"][scale] = run_scale(scale)
+        for step in result["cold_ms"]:
+            print(f"{scale:>8} {step:>20} {result['cold_ms'][step]:>10.1f} {result['warm_ms'][step]:>10.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for scale, kind, step, old_ms, new_ms in regressions:
+            print(f"REGRESSION {scale} {step} ({kind[:-3]}): {old_ms:.1f} ms -> {new_ms:.1f} ms")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import os
+import sys
+
+from atomic_files import atomic_path
+from data_loader import file_signature
+from schemas import read_csv, schema_token
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Fall back to plain CSV parsing without pyarrow
+    pa = None
+    feather = None
+
+# Columnar copies are kept next to their source CSV in this folder
+COLUMNAR_DIR = ".columnar"
+SIGNATURE_KEY = b"source_signature"
+
+# Folders converted by `python columnar_store.py` when no folder is given
+DEFAULT_DIRECTORIES = [".", "data", "r Visualization"]
+
+
+def columnar_path(csv_path):
+    """Return the Feather file that mirrors a CSV"""
+    directory, filename = os.path.split(os.path.abspath(csv_path))
+    name = os.path.splitext(filename)[0] + ".feather"
+    return os.path.join(directory, COLUMNAR_DIR, name)
+
+
+def _signature_token(csv_path):
+    mtime_ns, size = file_signature(csv_path)
+    return f"{mtime_ns}:{size}:{schema_token(csv_path)}".encode()
+
+
+def is_stale(csv_path):
+    """Check whether the columnar copy is missing, older than its CSV or built with another schema"""
+    path = columnar_path(csv_path)
+    if not os.path.exists(path):
+        return True
+    try:
+        with pa.memory_map(path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return True
+    return metadata.get(SIGNATURE_KEY) != _signature_token(csv_path)
+
+
+def convert_csv(csv_path):
+    """Parse a CSV once with its declared schema and store it as Feather"""
+    token = _signature_token(csv_path)
+    df = read_csv(csv_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SIGNATURE_KEY: token})
+
+    path = columnar_path(csv_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_path(path) as temp_path:
+        feather.write_feather(table, temp_path, compression="uncompressed")
+    return path
+
+
+def sync_directory(directory):
+    """Convert every CSV in a folder whose columnar copy is out of date"""
+    converted = []
+    for filename in sorted(os.listdir(directory)):
+        csv_path = os.path.join(directory, filename)
+        if filename.lower().endswith(".csv") and is_stale(csv_path):
+            convert_csv(csv_path)
+            converted.append(csv_path)
+    return converted
+
+
+def read_table(csv_path, columns=None):
+    """Read a table from its columnar copy, converting the CSV first if needed.
+
+    Only the requested columns are read, and uncompressed Feather files are
+    memory-mapped so untouched pages never leave the disk.
+    """
+    if feather is None:
+        return read_csv(csv_path, columns=columns)
+    if is_stale(csv_path):
+        convert_csv(csv_path)
+    table = feather.read_table(columnar_path(csv_path), columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    if feather is None:
+        sys.exit("pyarrow is required to build the columnar store")
+    for directory in sys.argv[1:] or DEFAULT_DIRECTORIES:
+        if os.path.isdir(directory):
+            for csv_path in sync_directory(directory):
+                print(f"Converted {csv_path}")
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from instrumentation import span
+
+# Loaded frames live at module level so every rerun and every session in the
+# Streamlit process shares them: {absolute path: (signature, DataFrame)}
+_cache = {}
+_stats = {}
+_derived = {}
+_lock = threading.Lock()
+
+
+def file_signature(path, use_hash=False):
+    """Return a token that changes whenever the file on disk changes"""
+    if use_hash:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_csv(path, dtype=None, use_hash=False, columns=None):
+    """Load a CSV, reusing the cached frame until the file changes.
+
+    Unless an explicit `dtype` is given, tables are read through the columnar
+    store with the column types declared in schemas.py, which also lets
+    callers project just the `columns` they need. The frame
+    returned is shared between reruns and sessions, so callers must treat it
+    as read-only and copy before mutating.
+    """
+    key = os.path.abspath(path)
+    if columns is not None:
+        key = (key, tuple(columns))
+    signature = file_signature(path, use_hash)
+    with _lock:
+        stats = _stats.setdefault(key, {"hits": 0, "misses": 0, "bytes": 0})
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            stats["hits"] += 1
+            return entry[1]
+        stats["misses"] += 1
+
+    with span("load_csv", file=os.path.basename(path)) as current:
+        if dtype is None:
+            from columnar_store import read_table
+
+            df = read_table(path, columns=columns)
+        else:
+            df = pd.read_csv(path, dtype=dtype, usecols=columns)
+        current.rows = len(df)
+
+    memory = int(df.memory_usage(deep=True).sum())
+    with _lock:
+        _cache[key] = (signature, df)
+        stats["bytes"] = memory
+    return df
+
+
+def cached_derived(name, paths, builder):
+    """Build a structure from one or more CSVs once per version of those files"""
+    signature = tuple(file_signature(path) for path in paths)
+    with _lock:
+        entry = _derived.get(name)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+    value = builder()
+
+    with _lock:
+        _derived[name] = (signature, value)
+    return value
+
+
+def _describe(key):
+    if isinstance(key, tuple):
+        return f"{os.path.relpath(key[0])} [{', '.join(key[1])}]"
+    return os.path.relpath(key)
+
+
+def cache_stats():
+    """Return per-file hit/miss counts and the memory held by each cached frame as a DataFrame"""
+    with _lock:
+        rows = [
+            {"file": _describe(key), "hits": stats["hits"], "misses": stats["misses"],
+             "memory_mb": round(stats["bytes"] / 1024 / 1024, 3)}
+            for key, stats in _stats.items()
+        ]
+    return pd.DataFrame(rows, columns=["file", "hits", "misses", "memory_mb"])
+
+
+def clear_cache():
+    """Drop every cached frame and reset the counters"""
+    with _lock:
+        _cache.clear()
+        _derived.clear()
+        _stats.clear()
@@ -1,9 +1,17 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+import numpy as np
 import pandas as pd
 import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 import streamlit as st
 
+from instrumentation import span, timed
+
 # Database connection configuration
 DB_CONFIG = {
     'host': 'localhost',
@@ -12,179 +20,407 @@ DB_CONFIG = {
     'database': 'StudentInformationSystem'
 }
 
+# Connection pool configuration
+POOL_CONFIG = {
+    'pool_name': 'student_information_system',
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+    'pool_reset_session': True
+}
+
+# Seconds to wait for a free pooled connection before giving up
+POOL_CHECKOUT_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+
+# Point this at a SQLite file to run every query against a local stand-in instead of MySQL
+SQLITE_PATH = os.environ.get('DB_SQLITE_PATH')
+
+DB_ERRORS = (Error, sqlite3.Error)
+
+# Rows per executemany/commit when bulk loading CSVs
+BULK_BATCH_SIZE = int(os.environ.get('DB_BULK_BATCH_SIZE', 5000))
+
+# Columns loaded by default per table; event_id is left to AUTO_INCREMENT
+BULK_LOAD_COLUMNS = {
+    'EventInfo': ['student_id', 'event_name', 'event_date', 'event_location',
+                  'participation_type', 'achievement']
+}
+
+# Events per keyset page when streaming EventInfo with iter_events
+EVENT_PAGE_SIZE = int(os.environ.get('DB_EVENT_PAGE_SIZE', 1000))
+
+# Seconds before the cached set of valid student IDs is reloaded
+STUDENT_CACHE_TTL = float(os.environ.get('STUDENT_CACHE_TTL', 300))
+
+# Event listings; sql/migrations/001_eventinfo_indexes.sql indexes both access patterns
+ALL_EVENTS_QUERY = """
+SELECT e.event_id, e.student_id, e.event_name, e.event_date, 
+       e.event_location, e.participation_type, e.achievement
+FROM EventInfo e
+JOIN Student s ON e.student_id = s.student_id
+ORDER BY e.event_date DESC
+"""
+
+STUDENT_EVENTS_QUERY = """
+SELECT event_id, event_name, event_date, event_location, 
+       participation_type, achievement
+FROM EventInfo
+WHERE student_id = %s
+ORDER BY event_date DESC
+"""
+
+# One keyset page of events, newest first; {where} holds the filters and the
+# position after the previous page. Served by the indexes in sql/migrations/
+EVENT_PAGE_QUERY = """
+SELECT e.event_id, e.student_id, e.event_name, e.event_date, 
+       e.event_location, e.participation_type, e.achievement
+FROM EventInfo e
+JOIN Student s ON e.student_id = s.student_id
+{where}
+ORDER BY e.event_date DESC, e.event_id DESC
+LIMIT %s
+"""
+
+# Rows after the key (event_date, event_id) of the previous page; the leading
+# bound on event_date lets the index seek straight to the next page
+EVENT_KEYSET_CONDITION = "e.event_date <= %s AND (e.event_date < %s OR e.event_id < %s)"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_student_cache = {'ids': None, 'id_set': frozenset(), 'version': None, 'loaded_at': 0.0}
+_student_cache_lock = threading.Lock()
+
+def get_connection_pool():
+    """Create the shared MySQL connection pool on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(**POOL_CONFIG, **DB_CONFIG)
+        return _pool
+
+def _checkout():
+    """Take a connection from the pool, waiting while every connection is busy"""
+    deadline = time.monotonic() + POOL_CHECKOUT_TIMEOUT
+    while True:
+        try:
+            return get_connection_pool().get_connection()
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
 def get_db_connection():
-    """Create and return a database connection"""
+    """Check out a healthy database connection from the pool"""
+    if SQLITE_PATH:
+        return sqlite3.connect(SQLITE_PATH)
+    connection = None
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        if connection.is_connected():
-            return connection
+        connection = _checkout()
+        # Health check: transparently reconnect if the server dropped this connection
+        connection.ping(reconnect=True, attempts=2, delay=0)
+        return connection
     except Error as e:
+        if connection is not None:
+            # Hand the slot back, or every failed ping would shrink the pool for good
+            try:
+                connection.close()
+            except Error:
+                pass
         st.error(f"Error connecting to MySQL database: {e}")
         return None
 
 def close_connection(connection, cursor=None):
-    """Close database connection and cursor"""
+    """Close the cursor and return the connection to the pool"""
     if cursor:
         cursor.close()
-    if connection and connection.is_connected():
+    if connection:
         connection.close()
 
-def initialize_database():
-    """Initialize database tables if they don't exist"""
+@contextmanager
+def db_connection():
+    """Check out a pooled connection for the duration of a with-block"""
     connection = get_db_connection()
-    if not connection:
-        return False
-    
-    cursor = connection.cursor()
     try:
-        # Read SQL file and execute
-        with open('create_event_info_table.sql', 'r') as file:
-            sql_commands = file.read()
-            
-        # Split commands by semicolon and execute each
-        for command in sql_commands.split(';'):
-            if command.strip():
-                cursor.execute(command)
-        
-        connection.commit()
-        return True
-    except Error as e:
-        st.error(f"Error initializing database: {e}")
-        return False
+        yield connection
     finally:
-        close_connection(connection, cursor)
+        close_connection(connection)
 
-def student_exists(student_id):
-    """Check if a student exists in the database"""
+def sql(query):
+    """Adapt MySQL-style %s placeholders to the active backend"""
+    return query.replace('%s', '?') if SQLITE_PATH else query
+
+def initialize_database():
+    """Initialize database tables if they don't exist"""
+    with db_connection() as connection:
+        if not connection:
+            return False
+        
+        cursor = connection.cursor()
+        try:
+            # Read SQL file and execute
+            with open('create_event_info_table.sql', 'r') as file:
+                sql_commands = file.read()
+                
+            # Split commands by semicolon and execute each
+            for command in sql_commands.split(';'):
+                if command.strip():
+                    cursor.execute(command)
+            
+            connection.commit()
+            return True
+        except DB_ERRORS as e:
+            st.error(f"Error initializing database: {e}")
+            return False
+        finally:
+            cursor.close()
+
+def _student_source_version():
+    """Return a token that changes when the CSV student source changes"""
+    if os.path.exists("Student.csv"):
+        stat = os.stat("Student.csv")
+        return ("csv", stat.st_mtime_ns, stat.st_size)
+    return ("db",)
+
+def _load_student_ids(connection=None):
+    """Read every valid student ID from Student.csv or the Student table"""
     # For CSV-based approach
     if os.path.exists("Student.csv"):
-        student_df = pd.read_csv("Student.csv")
-        return student_id in student_df['student_id'].values
+        return pd.read_csv("Student.csv", usecols=['student_id'])['student_id'].to_numpy()
     
     # For SQL-based approach
-    connection = get_db_connection()
-    if not connection:
-        return False
+    if connection is None:
+        with db_connection() as connection:
+            return _load_student_ids(connection) if connection else None
     
     cursor = connection.cursor()
     try:
-        cursor.execute("SELECT 1 FROM Student WHERE student_id = %s", (student_id,))
-        result = cursor.fetchone()
-        return result is not None
-    except Error as e:
-        st.error(f"Error checking if student exists: {e}")
-        return False
+        cursor.execute("SELECT student_id FROM Student")
+        return np.array([row[0] for row in cursor.fetchall()])
+    except DB_ERRORS as e:
+        st.error(f"Error loading student IDs: {e}")
+        return None
     finally:
-        close_connection(connection, cursor)
+        cursor.close()
+
+def valid_student_ids(connection=None):
+    """Return the sorted array of valid student IDs, cached until the TTL expires or the source changes"""
+    version = _student_source_version()
+    with _student_cache_lock:
+        if (_student_cache['ids'] is not None and _student_cache['version'] == version
+                and time.monotonic() - _student_cache['loaded_at'] < STUDENT_CACHE_TTL):
+            return _student_cache['ids']
+    
+    student_ids = _load_student_ids(connection)
+    if student_ids is None:
+        # Don't cache a failed load
+        return np.array([], dtype=np.int64)
+    student_ids = np.unique(student_ids)
+    
+    with _student_cache_lock:
+        _student_cache.update(ids=student_ids, id_set=frozenset(student_ids.tolist()),
+                              version=version, loaded_at=time.monotonic())
+    return student_ids
+
+def refresh_student_cache():
+    """Forget the cached student IDs; call after loading students in bulk"""
+    with _student_cache_lock:
+        _student_cache.update(ids=None, id_set=frozenset(), version=None, loaded_at=0.0)
 
+def student_exists(student_id, connection=None):
+    """Check if a student exists, using the cached set of valid IDs"""
+    valid_student_ids(connection)
+    with _student_cache_lock:
+        return student_id in _student_cache['id_set']
+
+def students_exist(student_ids, connection=None):
+    """Return a boolean array telling which of `student_ids` exist"""
+    return np.isin(np.asarray(student_ids), valid_student_ids(connection), assume_unique=False)
+
+@timed("db.add_event_info")
 def add_event_info(student_id, event_name, event_date, event_location=None, 
                   participation_type=None, achievement=None):
     """Add a new event information record to the database"""
-    # Validate student_id
-    if not student_exists(student_id):
-        return False, "Student ID does not exist"
-    
-    connection = get_db_connection()
-    if not connection:
-        return False, "Database connection failed"
-    
-    cursor = connection.cursor()
-    try:
-        # Insert new event info
-        insert_query = """
-        INSERT INTO EventInfo 
-        (student_id, event_name, event_date, event_location, participation_type, achievement) 
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(insert_query, (
-            student_id, event_name, event_date, event_location, 
-            participation_type, achievement
-        ))
+    with db_connection() as connection:
+        if not connection:
+            return False, "Database connection failed"
         
-        connection.commit()
-        return True, f"Event information added successfully for student {student_id}"
-    except Error as e:
-        connection.rollback()
-        return False, f"Error adding event info: {e}"
-    finally:
-        close_connection(connection, cursor)
+        # Validate student_id on the same connection used for the insert
+        if not student_exists(student_id, connection):
+            return False, "Student ID does not exist"
+        
+        cursor = connection.cursor()
+        try:
+            # Insert new event info
+            insert_query = """
+            INSERT INTO EventInfo 
+            (student_id, event_name, event_date, event_location, participation_type, achievement) 
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(sql(insert_query), (
+                student_id, event_name, event_date, event_location, 
+                participation_type, achievement
+            ))
+            
+            connection.commit()
+            return True, f"Event information added successfully for student {student_id}"
+        except DB_ERRORS as e:
+            connection.rollback()
+            return False, f"Error adding event info: {e}"
+        finally:
+            cursor.close()
 
+@timed("db.get_all_events")
 def get_all_events():
     """Get all events from the database"""
-    connection = get_db_connection()
-    if not connection:
-        return pd.DataFrame()
-    
-    try:
-        query = """
-        SELECT e.event_id, e.student_id, e.event_name, e.event_date, 
-               e.event_location, e.participation_type, e.achievement
-        FROM EventInfo e
-        JOIN Student s ON e.student_id = s.student_id
-        ORDER BY e.event_date DESC
-        """
-        return pd.read_sql(query, connection)
-    except Error as e:
-        st.error(f"Error retrieving events: {e}")
-        return pd.DataFrame()
-    finally:
-        close_connection(connection)
+    with db_connection() as connection:
+        if not connection:
+            return pd.DataFrame()
+        
+        try:
+            return pd.read_sql(ALL_EVENTS_QUERY, connection)
+        except DB_ERRORS as e:
+            st.error(f"Error retrieving events: {e}")
+            return pd.DataFrame()
 
+@timed("db.get_student_events")
 def get_student_events(student_id):
     """Get all events for a specific student"""
-    connection = get_db_connection()
-    if not connection:
-        return pd.DataFrame()
+    with db_connection() as connection:
+        if not connection:
+            return pd.DataFrame()
+        
+        try:
+            return pd.read_sql(sql(STUDENT_EVENTS_QUERY), connection, params=(student_id,))
+        except DB_ERRORS as e:
+            st.error(f"Error retrieving student events: {e}")
+            return pd.DataFrame()
+
+def iter_events(page_size=EVENT_PAGE_SIZE, after=None, student_id=None, event_name=None,
+                start_date=None, end_date=None, as_arrow=False):
+    """Yield the events of get_all_events page by page, newest first.
+
+    Each page is a separate query that continues from the (event_date,
+    event_id) of the previous page's last row instead of using OFFSET, so
+    every page costs the same however deep the walk goes and memory stays
+    bounded by `page_size`. Pass such a key as `after` to resume a walk. A
+    connection is only checked out while a page is being read. Pages are
+    DataFrames, or pyarrow RecordBatches with `as_arrow=True`.
+    """
+    filters, params = [], []
+    for column, operator, value in [("student_id", "=", student_id), ("event_name", "=", event_name),
+                                    ("event_date", ">=", start_date), ("event_date", "<=", end_date)]:
+        if value is not None:
+            filters.append(f"e.{column} {operator} %s")
+            params.append(value)
+
+    key = after
+    while True:
+        conditions, page_params = list(filters), list(params)
+        if key is not None:
+            conditions.append(EVENT_KEYSET_CONDITION)
+            page_params += [key[0], key[0], key[1]]
+        query = EVENT_PAGE_QUERY.format(where="WHERE " + " AND ".join(conditions) if conditions else "")
+        
+        with span("db.iter_events.page") as current, db_connection() as connection:
+            if not connection:
+                return
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql(query), page_params + [page_size])
+                columns = [description[0] for description in cursor.description]
+                page = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+                current.rows = len(page)
+            except DB_ERRORS as e:
+                st.error(f"Error retrieving events: {e}")
+                return
+            finally:
+                cursor.close()
+        
+        if page.empty:
+            return
+        key = (page['event_date'].iat[-1], int(page['event_id'].iat[-1]))
+        if as_arrow:
+            import pyarrow as pa
+            yield pa.RecordBatch.from_pandas(page, preserve_index=False)
+        else:
+            yield page
+        if len(page) < page_size:
+            return
+
+@timed("db.bulk_load_csv")
+def bulk_load_csv(csv_path, table="EventInfo", columns=None, batch_size=BULK_BATCH_SIZE,
+                  validate_students=True):
+    """Stream a CSV into a table in batches and return (inserted, rejected) row counts.
+
+    The file is read `batch_size` rows at a time. When the table references
+    students through a student_id column, each batch's IDs are checked in
+    one vectorized lookup against the cached set of valid students and rows
+    for unknown students are rejected; rows loaded into Student itself are
+    the new students and are not checked. Each batch is inserted with a single executemany and
+    committed on its own.
+    """
+    if not table.isidentifier():
+        raise ValueError(f"Invalid table name: {table}")
+    if columns is None:
+        columns = BULK_LOAD_COLUMNS.get(table)
+
+    inserted = rejected = 0
+    with db_connection() as connection:
+        if not connection:
+            return inserted, rejected
+        
+        cursor = connection.cursor()
+        try:
+            for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=batch_size):
+                if validate_students and table != 'Student' and 'student_id' in chunk.columns:
+                    valid = students_exist(chunk['student_id'], connection)
+                    rejected += int((~valid).sum())
+                    chunk = chunk[valid]
+                if chunk.empty:
+                    continue
+                
+                column_list = ", ".join(f"`{column}`" if not SQLITE_PATH else f'"{column}"' for column in chunk.columns)
+                placeholders = ", ".join(["%s"] * len(chunk.columns))
+                insert_query = f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})"
+                rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+                cursor.executemany(sql(insert_query), list(rows))
+                connection.commit()
+                inserted += len(chunk)
+        except DB_ERRORS as e:
+            connection.rollback()
+            st.error(f"Error bulk loading {csv_path} into {table}: {e}")
+        finally:
+            cursor.close()
     
-    try:
-        query = """
-        SELECT event_id, event_name, event_date, event_location, 
-               participation_type, achievement
-        FROM EventInfo
-        WHERE student_id = %s
-        ORDER BY event_date DESC
-        """
-        return pd.read_sql(query, connection, params=(student_id,))
-    except Error as e:
-        st.error(f"Error retrieving student events: {e}")
-        return pd.DataFrame()
-    finally:
-        close_connection(connection)
+    if table == 'Student' and inserted:
+        refresh_student_cache()
+    return inserted, rejected
 
-def create_dummy_event_info_csv():
+def create_dummy_event_info_csv(count=50):
     """Create a CSV file with dummy event data if SQL connection fails"""
     if not os.path.exists("EventInfo.csv"):
         # Create student IDs from existing Student.csv
-        student_ids = pd.read_csv("Student.csv")["student_id"].tolist()
-        
-        # Create a DataFrame for EventInfo
-        event_info_data = []
-        event_id = 1
+        student_ids = pd.read_csv("Student.csv")["student_id"].to_numpy()
         
         # Event templates
-        events = [
+        events = pd.Series([
             "Annual Tech Symposium", "Cultural Fest", "Hackathon", "Sports Meet",
             "Debate Competition", "Science Exhibition", "Workshop on AI", "Coding Contest",
             "Alumni Meet", "Industrial Visit"
-        ]
+        ])
         
-        # Create 50 dummy records
-        for i in range(50):
-            student_id = student_ids[i % len(student_ids)]
-            event_name = events[i % len(events)] + f" {2023 + (i // 10)}"
-            event_info_data.append({
-                "event_id": event_id,
-                "student_id": student_id,
-                "event_name": event_name,
-                "event_date": f"2023-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}",
-                "event_location": "Campus",
-                "participation_type": "Participant",
-                "achievement": "Completed" if i % 3 == 0 else None
-            })
-            event_id += 1
+        # Build every dummy record at once instead of row by row
+        i = pd.Series(range(count))
+        event_info_df = pd.DataFrame({
+            "event_id": i + 1,
+            "student_id": student_ids[i % len(student_ids)],
+            "event_name": events.iloc[i % len(events)].to_numpy() + " " + (2023 + i // 10).astype(str),
+            "event_date": "2023-" + ((i % 12) + 1).map("{:02d}".format) + "-" + ((i % 28) + 1).map("{:02d}".format),
+            "event_location": "Campus",
+            "participation_type": "Participant",
+            "achievement": pd.Series("Completed", index=i.index).where(i % 3 == 0)
+        })
         
-        # Create DataFrame and save to CSV
-        event_info_df = pd.DataFrame(event_info_data)
+        # Save to CSV
         event_info_df.to_csv("EventInfo.csv", index=False)
         return True
-    return False 
\ No newline at end of file
+    return False
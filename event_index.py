@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+
+def _row_hashes(df):
+    """Hash each row by its values, so categorical columns compare equal across category sets"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class EventIndex:
+    """Inverted indexes and metric rollups over the event table.
+
+    Row positions are kept per student_id and per event_name. When the event
+    file only grew (the usual append-only case), `refresh` indexes just the
+    new rows instead of rebuilding everything. A hash per indexed row tells
+    an append apart from an edit to rows already indexed.
+    """
+
+    def __init__(self):
+        self.df = None
+        self.row_hashes = np.array([], dtype=np.uint64)
+        self.by_student = {}
+        self.by_event = {}
+        self.achievements = 0
+        self._options = None
+
+    def copy(self):
+        """Return an index that can be refreshed without changing this one"""
+        index = EventIndex()
+        index.df = self.df
+        index.row_hashes = self.row_hashes
+        index.by_student = dict(self.by_student)
+        index.by_event = dict(self.by_event)
+        index.achievements = self.achievements
+        index._options = self._options
+        return index
+
+    def _extends(self, df):
+        """Check whether `df` is the indexed table with rows appended"""
+        if self.df is None or list(df.columns) != list(self.df.columns) or len(df) < len(self.df):
+            return False
+        return np.array_equal(_row_hashes(df.iloc[:len(self.df)]), self.row_hashes)
+
+    def _add_positions(self, index, groups, offset):
+        for key, positions in groups.items():
+            positions = positions + offset
+            if key in index:
+                index[key] = np.concatenate([index[key], positions])
+            else:
+                index[key] = positions
+                self._options = None
+
+    def refresh(self, df):
+        """Bring the index up to date with `df`, indexing only appended rows when possible"""
+        if df is self.df:
+            return self
+        if not self._extends(df):
+            self.__init__()
+            offset = 0
+        else:
+            offset = len(self.df)
+
+        new_rows = df.iloc[offset:]
+        if len(new_rows):
+            self._add_positions(self.by_student, new_rows.groupby("student_id", observed=True).indices, offset)
+            self._add_positions(self.by_event, new_rows.groupby("event_name", observed=True).indices, offset)
+            self.achievements += int(new_rows["achievement"].notna().sum())
+            self.row_hashes = np.concatenate([self.row_hashes, _row_hashes(new_rows)])
+        self.df = df
+        return self
+
+    def options(self):
+        """Return the sorted student IDs and event names for the filter dropdowns"""
+        if self._options is None:
+            self._options = (sorted(self.by_student), sorted(self.by_event))
+        return self._options
+
+    def metrics(self):
+        """Return (distinct events, distinct participants, achievements)"""
+        return len(self.by_event), len(self.by_student), self.achievements
+
+    def filter(self, student_id=None, event_name=None):
+        """Return the events matching the given student and/or event name.
+
+        Without filters the indexed frame itself is returned, so nothing is
+        copied; otherwise only the matching rows are gathered.
+        """
+        positions = None
+        empty = np.array([], dtype=np.intp)
+        if student_id is not None:
+            positions = self.by_student.get(student_id, empty)
+        if event_name is not None:
+            event_positions = self.by_event.get(event_name, empty)
+            positions = event_positions if positions is None else np.intersect1d(positions, event_positions)
+        if positions is None:
+            return self.df
+        return self.df.iloc[np.sort(positions)]
+
@@ -0,0 +1,150 @@
+import csv
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from atomic_files import atomic_path
+from data_loader import file_signature
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+EVENT_FILE = "EventInfo.csv"
+EVENT_COLUMNS = [
+    "event_id", "student_id", "event_name", "event_date",
+    "event_location", "participation_type", "achievement"
+]
+
+# Serializes writers inside this process; the lock file serializes processes
+_thread_lock = threading.Lock()
+
+
+@contextmanager
+def _locked(path):
+    """Hold an exclusive lock on the event file for the duration of a write"""
+    with _thread_lock, open(f"{path}.lock", "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_atomic(path, write):
+    """Write a file through a temporary copy and rename it into place"""
+    with atomic_path(path) as temp_path, open(temp_path, "w", newline="") as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _read_sequence(sequence_path):
+    """Return the last issued event_id and the event file signature it was recorded against"""
+    if not os.path.exists(sequence_path):
+        return 0, None
+    with open(sequence_path) as file:
+        fields = file.read().split()
+    last_id = int(fields[0]) if fields else 0
+    # Files written before the signature was recorded hold only the ID
+    signature = tuple(int(field) for field in fields[1:]) if len(fields) == 3 else None
+    return last_id, signature
+
+
+def _write_sequence(path, last_id):
+    """Persist the last issued event_id along with the event file's current signature"""
+    signature = file_signature(path) if os.path.exists(path) else ()
+    _write_atomic(f"{path}.seq", lambda file: file.write(" ".join(map(str, (last_id,) + signature))))
+
+
+def _reserve_ids(path, count):
+    """Reserve `count` consecutive event IDs from the persisted sequence.
+
+    Must be called while holding the event file lock. The sequence is only
+    trusted while the CSV is the one it was recorded against; when the file
+    was replaced or rewritten behind the store's back, it is reseeded from
+    the largest event_id in the CSV.
+    """
+    last_id, signature = _read_sequence(f"{path}.seq")
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        if signature != file_signature(path):
+            event_ids = pd.read_csv(path, usecols=["event_id"])["event_id"]
+            if not event_ids.empty:
+                last_id = max(last_id, int(event_ids.max()))
+    _write_sequence(path, last_id + count)
+    return list(range(last_id + 1, last_id + count + 1))
+
+
+def _needs_newline(path):
+    """Check whether the file's last line is missing its terminator"""
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) not in (b"\n", b"\r")
+
+
+def add_events(records, path=EVENT_FILE):
+    """Append several events in one locked write and return their new IDs.
+
+    Each record is a dict with the EVENT_COLUMNS fields except event_id.
+    Only the new rows are written, so the cost does not grow with the file.
+    """
+    records = list(records)
+    if not records:
+        return []
+
+    with _locked(path):
+        event_ids = _reserve_ids(path, len(records))
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        needs_newline = not is_new and _needs_newline(path)
+        with open(path, "a", newline="") as file:
+            if needs_newline:
+                file.write("\n")
+            writer = csv.writer(file)
+            if is_new:
+                writer.writerow(EVENT_COLUMNS)
+            writer.writerows(
+                [event_id] + [record.get(column) for column in EVENT_COLUMNS[1:]]
+                for event_id, record in zip(event_ids, records)
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        # Record the appended file, so the next reservation need not rescan it
+        _write_sequence(path, event_ids[-1])
+    return event_ids
+
+
+def add_event(record, path=EVENT_FILE):
+    """Append one event and return its new ID"""
+    return add_events([record], path)[0]
+
+
+def compact_events(path=EVENT_FILE):
+    """Rewrite the event file sorted by event_id without duplicate IDs.
+
+    The new file is written next to the old one and renamed over it, so
+    readers always see either the old or the new complete file.
+    """
+    with _locked(path):
+        if not os.path.exists(path):
+            return 0
+        event_info_df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        event_info_df = (
+            event_info_df.assign(_order=pd.to_numeric(event_info_df["event_id"]))
+            .drop_duplicates("_order", keep="last")
+            .sort_values("_order")
+            .drop(columns="_order")
+        )
+        _write_atomic(path, lambda file: event_info_df.to_csv(file, index=False))
+    return len(event_info_df)
@@ -0,0 +1,251 @@
+import argparse
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from atomic_files import atomic_path
+from instrumentation import span
+
+# Export file formats and their extensions
+EXPORT_FORMATS = {"CSV": ".csv", "Parquet": ".parquet", "Excel": ".xlsx"}
+
+# Who an export covers, and the column that selects them (None for the whole cohort)
+EXPORT_SCOPES = {"cohort": None, "student": "student_id", "course": "course_id"}
+
+# Tables that can be exported
+EXPORT_TABLES = ["attendance", "grades", "events"]
+
+# Rows read and written per step; this bounds memory whatever the table size
+EXPORT_CHUNK_ROWS = int(os.environ.get("SIS_EXPORT_CHUNK_ROWS", 50_000))
+
+# Folder the finished exports are written to
+EXPORT_DIR = os.environ.get("SIS_EXPORT_DIR", "exports")
+
+# Rows per Excel sheet, header included; longer exports continue on a new sheet
+EXCEL_MAX_ROWS = 1_048_576
+
+# Event-chart aggregates read by `r file/updated_cia.R`
+EVENT_SUMMARY_FILE = "event_summary.csv"
+
+
+def _write_csv(chunks, path, columns):
+    with open(path, "w", newline="") as file:
+        header = True
+        for chunk in chunks:
+            chunk.to_csv(file, index=False, header=header)
+            header = False
+        if header:
+            pd.DataFrame(columns=columns).to_csv(file, index=False)
+
+
+def _write_parquet(chunks, path, columns):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                # A column that is empty in the first chunk has no type yet; store it as text
+                schema = pa.schema(
+                    [field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema],
+                    metadata=table.schema.metadata,
+                )
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+        if writer is None:
+            pq.write_table(pa.Table.from_pandas(pd.DataFrame(columns=columns), preserve_index=False), path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_excel(chunks, path, columns):
+    """Write chunks to consecutive rows, starting a new sheet when one is full.
+
+    openpyxl keeps the workbook in memory until it is saved, so Excel suits
+    student and course exports; CSV and Parquet stream whole-cohort exports.
+    """
+    try:
+        writer = pd.ExcelWriter(path, engine="openpyxl")
+    except ImportError as e:
+        raise RuntimeError("Excel export needs the openpyxl package (pip install openpyxl)") from e
+    with writer:
+        sheet, row = 1, 0
+        for chunk in chunks:
+            while len(chunk):
+                if row == EXCEL_MAX_ROWS:
+                    sheet, row = sheet + 1, 0
+                part = chunk.iloc[:EXCEL_MAX_ROWS - row - (row == 0)]
+                part.to_excel(writer, sheet_name=f"Sheet{sheet}", startrow=row, header=row == 0, index=False)
+                row += len(part) + (row == 0)
+                chunk = chunk.iloc[len(part):]
+        if sheet == 1 and row == 0:
+            pd.DataFrame(columns=columns).to_excel(writer, sheet_name="Sheet1", index=False)
+
+
+WRITERS = {"CSV": _write_csv, "Parquet": _write_parquet, "Excel": _write_excel}
+
+
+def scope_filter(scope, value=None):
+    """Return the equality filter that selects one student, one course or everyone"""
+    column = EXPORT_SCOPES[scope]
+    return None if column is None else {column: value}
+
+
+def exportable_tables(repository, scope):
+    """Return the tables that have the column a scope filters on"""
+    column = EXPORT_SCOPES[scope]
+    return [table for table in EXPORT_TABLES if column is None or column in repository.table_columns(table)]
+
+
+def export_path(directory, table, scope, value, export_format, suffix=""):
+    """Return a file name that says what was exported and when, e.g. grades_student_7001_20240101-120000.csv"""
+    who = scope if value is None else f"{scope}_{value}"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"{table}_{who}_{stamp}{suffix}{EXPORT_FORMATS[export_format]}")
+
+
+def export_table(repository, table, path, export_format="CSV", where=None, chunk_rows=EXPORT_CHUNK_ROWS,
+                 progress=None):
+    """Stream the rows of a table matching `where` to a file and return how many were written.
+
+    Rows are read and written `chunk_rows` at a time, so only one chunk is
+    held in memory (except for Excel, see _write_excel). `progress` is
+    called with the running row count after every chunk. The file only
+    appears at `path` once it is complete.
+    """
+    written = 0
+
+    def chunks():
+        nonlocal written
+        for chunk in repository.iter_rows(table, chunk_rows, where):
+            yield chunk
+            written += len(chunk)
+            if progress is not None:
+                progress(written)
+
+    with atomic_path(path) as temp_path, span("export", table=table, format=export_format) as current:
+        WRITERS[export_format](chunks(), temp_path, repository.table_columns(table))
+        current.rows = written
+    return written
+
+
+class ExportJob:
+    """Exports of one or more tables running on a background thread.
+
+    `state` moves from "running" to "done" or "failed"; `done` and `total`
+    count rows so the dashboard can show progress while the thread works.
+    """
+
+    def __init__(self, repository, tables, scope="cohort", value=None, export_format="CSV", directory=EXPORT_DIR):
+        self.id = uuid.uuid4().hex[:8]
+        self.repository = repository
+        self.tables = list(tables)
+        self.scope = scope
+        self.value = value
+        self.export_format = export_format
+        self.directory = directory
+        self.state = "running"
+        self.error = None
+        self.done = 0
+        self.total = None
+        self.paths = []
+        self.started = time.time()
+        self.finished = None
+
+    def _run(self):
+        where = scope_filter(self.scope, self.value)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.total = sum(self.repository.table_count(table, where=where) for table in self.tables)
+            for table in self.tables:
+                path = export_path(self.directory, table, self.scope, self.value, self.export_format, f"_{self.id}")
+                base = self.done
+                export_table(self.repository, table, path, self.export_format, where,
+                             progress=lambda rows: setattr(self, "done", base + rows))
+                self.paths.append(path)
+            self.state = "done"
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+        finally:
+            self.finished = time.time()
+
+    def progress(self):
+        """Return the share of rows written so far, between 0 and 1"""
+        if self.state == "done":
+            return 1.0
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+    def start(self):
+        threading.Thread(target=self._run, name=f"export-{self.id}", daemon=True).start()
+        return self
+
+
+_jobs = {}
+_lock = threading.Lock()
+
+
+def start_export(repository, tables, scope="cohort", value=None, export_format="CSV", directory=EXPORT_DIR):
+    """Start exporting tables in the background and return the job.
+
+    The repository is pinned first, so a CSV export reads one consistent
+    version of the data even if the files change while it runs.
+    """
+    job = ExportJob(repository.pinned(), tables, scope, value, export_format, directory)
+    with _lock:
+        _jobs[job.id] = job
+    return job.start()
+
+
+def get_job(job_id):
+    """Return a job started in this process, or None"""
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def event_summary(repository, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Count the rows per event_id, most first, as the R event charts do"""
+    counts = pd.Series(dtype="int64")
+    for chunk in repository.iter_rows("events", chunk_rows):
+        counts = counts.add(chunk["event_id"].value_counts(), fill_value=0)
+    summary = counts.astype("int64").rename_axis("event_id").reset_index(name="participant_count")
+    return summary.sort_values(["participant_count", "event_id"], ascending=[False, True], ignore_index=True)
+
+
+def write_event_summary(repository, path=EVENT_SUMMARY_FILE):
+    """Write the event-chart aggregates to a small CSV for the R scripts and return its path"""
+    with atomic_path(path) as temp_path:
+        event_summary(repository).to_csv(temp_path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    from repository import get_repository
+
+    parser = argparse.ArgumentParser(description="Export dashboard tables in chunks")
+    parser.add_argument("tables", nargs="*", help=f"tables to export ({', '.join(EXPORT_TABLES)})")
+    parser.add_argument("--scope", choices=list(EXPORT_SCOPES), default="cohort")
+    parser.add_argument("--value", help="student or course ID for the student and course scopes")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="CSV")
+    parser.add_argument("--directory", default=EXPORT_DIR)
+    parser.add_argument("--event-summary", action="store_true", help=f"also write {EVENT_SUMMARY_FILE}")
+    args = parser.parse_args()
+    for table in args.tables:
+        if table not in EXPORT_TABLES:
+            parser.error(f"unknown table {table!r} (choose from {', '.join(EXPORT_TABLES)})")
+
+    repository = get_repository().pinned()
+    value = int(args.value) if args.scope == "student" and args.value is not None else args.value
+    os.makedirs(args.directory, exist_ok=True)
+    for table in args.tables:
+        path = export_path(args.directory, table, args.scope, value, args.format)
+        rows = export_table(repository, table, path, args.format, scope_filter(args.scope, value))
+        print(f"Exported {rows} rows to {path}")
+    if args.event_summary:
+        print(f"Event summary written to {write_event_summary(repository)}")
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+
+from atomic_files import atomic_path
+from data_loader import file_signature, load_csv
+from instrumentation import timed
+
+# Rollups are persisted next to their source CSV in this folder
+ROLLUP_DIR = ".rollups"
+
+# Group keys for each rollup level. Grade rows carry no term, so the term is
+# the calendar half-year of grading_date (e.g. "2024-H1").
+GRADE_LEVELS = {
+    "student": ["student_id"],
+    "course": ["course_id"],
+    "term": ["term"],
+}
+
+CIA_COLUMNS = ["cia1", "cia2", "cia3", "cia4"]
+CIA_BIN_EDGES = [5, 10, 15, 20]
+CIA_BIN_LABELS = ["0-4", "5-9", "10-14", "15-19", "20+"]
+
+# How each state column combines when two partial rollups are merged; the rest are summed
+MERGE_RULES = {"total_min": "min", "total_max": "max"}
+
+# Prefix of the per-status count columns, e.g. "status:Pass"
+STATUS_PREFIX = "status:"
+
+# Bytes read at a time when fingerprinting the already folded part of a file
+FINGERPRINT_BLOCK = 1 << 20
+
+
+def _term(grading_date):
+    dates = pd.to_datetime(grading_date.astype(str).str.strip(), errors="coerce")
+    half = np.where(dates.dt.month <= 6, "H1", "H2")
+    return (dates.dt.year.astype("Int64").astype(str) + "-" + half).where(dates.notna(), "Unknown")
+
+
+def partial_rollup(grades, keys):
+    """Aggregate a batch of grade rows into mergeable per-group state"""
+    status = grades["status"].astype(str).str.strip().str.lower()
+    columns = {
+        "term": _term(grades["grading_date"]) if "grading_date" in grades else "Unknown",
+        "passed": status == "pass",
+        "failed": status == "fail",
+        # Marks are stored as small nullable integers; aggregate them as float64
+        "total_marks": grades["total_marks"].astype("float64"),
+    }
+    for cia in CIA_COLUMNS:
+        if cia in grades:
+            bins = np.digitize(grades[cia].to_numpy(dtype=float, na_value=np.nan), CIA_BIN_EDGES)
+            for code, label in enumerate(CIA_BIN_LABELS):
+                columns[f"{cia}_{label}"] = bins == code
+    # One count column per status value, so statuses other than Pass/Fail are kept too
+    for value in grades["status"].dropna().astype(str).str.strip().unique():
+        columns[STATUS_PREFIX + value] = grades["status"].astype(str).str.strip() == value
+    grades = grades.assign(**columns)
+
+    aggregations = {
+        "count": ("total_marks", "size"),
+        "total_sum": ("total_marks", "sum"),
+        "total_min": ("total_marks", "min"),
+        "total_max": ("total_marks", "max"),
+        "passed": ("passed", "sum"),
+        "failed": ("failed", "sum"),
+    }
+    aggregations.update({name: (name, "sum") for name in columns if name.startswith(("cia", STATUS_PREFIX))})
+    return grades.groupby(keys, observed=True).agg(**aggregations)
+
+
+def merge_rollups(old, new):
+    """Combine two partial rollups of the same level"""
+    if old is None or old.empty:
+        return new
+    combined = pd.concat([old, new])
+    rules = {column: MERGE_RULES.get(column, "sum") for column in combined.columns}
+    merged = combined.groupby(level=list(range(combined.index.nlevels))).agg(rules)
+    # A status seen in only one of the two rollups counts zero in the other
+    statuses = [column for column in merged.columns if column.startswith(STATUS_PREFIX)]
+    return merged.astype({column: "int64" for column in statuses})
+
+
+def _fingerprint(path, size):
+    """Hash the first `size` bytes of a file, or return None if it is shorter"""
+    digest = hashlib.blake2b(digest_size=16)
+    remaining = size
+    with open(path, "rb") as file:
+        while remaining:
+            block = file.read(min(FINGERPRINT_BLOCK, remaining))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+        if size and block[-1:] not in (b"\n", b"\r") and file.read(1) not in (b"", b"\n", b"\r"):
+            # The last folded row was extended in place
+            return None
+    return digest.hexdigest()
+
+
+class GradeRollups:
+    """Per-student, per-course and per-term grade aggregates for one grade file.
+
+    Grade rows are treated as append-only: on refresh only the rows after
+    the ones already folded are added to the stored state. The bytes of the
+    folded part of the file are fingerprinted, so if earlier rows were
+    edited or removed the rollups are rebuilt. The state is persisted so a
+    restart also only processes new rows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory, filename = os.path.split(os.path.abspath(path))
+        self.store_path = os.path.join(directory, ROLLUP_DIR, os.path.splitext(filename)[0] + ".pkl")
+        self.signature = None
+        self.folded_bytes = 0
+        self.fingerprint = None
+        self.rows = 0
+        self.levels = {}
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.store_path):
+            try:
+                with open(self.store_path, "rb") as file:
+                    self.__dict__.update(pickle.load(file))
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+        state = {"signature": self.signature, "folded_bytes": self.folded_bytes, "fingerprint": self.fingerprint,
+                 "rows": self.rows, "levels": self.levels}
+        with atomic_path(self.store_path) as temp_path, open(temp_path, "wb") as file:
+            pickle.dump(state, file)
+
+    def refresh(self):
+        """Fold grade rows added since the last refresh into the rollups"""
+        signature = file_signature(self.path)
+        if signature == self.signature:
+            return self
+        return self._fold_new_rows(signature)
+
+    @timed("grade_rollups.refresh")
+    def _fold_new_rows(self, signature):
+        grades = load_csv(self.path)
+        size = os.path.getsize(self.path)
+        if (self.fingerprint is not None and size >= self.folded_bytes and len(grades) >= self.rows
+                and _fingerprint(self.path, self.folded_bytes) == self.fingerprint):
+            new_rows = grades.iloc[self.rows:]
+        else:
+            self.levels = {}
+            new_rows = grades
+
+        if not new_rows.empty or not self.levels:
+            for level, keys in GRADE_LEVELS.items():
+                self.levels[level] = merge_rollups(self.levels.get(level), partial_rollup(new_rows, keys))
+        self.folded_bytes = size
+        self.fingerprint = _fingerprint(self.path, size)
+        self.rows = len(grades)
+        self.signature = signature
+        self._save()
+        return self
+
+    def table(self, level):
+        """Return the rollup for a level with the mean total marks added"""
+        state = self.levels[level]
+        return state.assign(total_mean=state["total_sum"] / state["count"])
+
+    def cia_distribution(self, level, cia):
+        """Return the histogram of one CIA component per group of a level"""
+        columns = [f"{cia}_{label}" for label in CIA_BIN_LABELS]
+        return self.levels[level][columns].set_axis(CIA_BIN_LABELS, axis=1)
+
+    def status_counts(self):
+        """Return the number of grade rows per status, most common first"""
+        state = self.levels["student"]
+        totals = state[[column for column in state.columns if column.startswith(STATUS_PREFIX)]].sum()
+        totals.index = [column[len(STATUS_PREFIX):] for column in totals.index]
+        return totals.rename_axis("status").rename("count").sort_values(ascending=False, kind="stable")
+
+
+_rollups = {}
+_lock = threading.Lock()
+
+
+def get_grade_rollups(path="Grade.csv"):
+    """Return the shared, up-to-date rollups for a grade file"""
+    key = os.path.abspath(path)
+    with _lock:
+        if key not in _rollups:
+            _rollups[key] = GradeRollups(path)
+        return _rollups[key].refresh()
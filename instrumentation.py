@@ -0,0 +1,191 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from atomic_files import atomic_path
+
+# Opt in with SIS_INSTRUMENT=1; when off, spans are shared no-ops and
+# decorated functions are returned unwrapped
+ENABLED = os.environ.get("SIS_INSTRUMENT", "").lower() not in ("", "0", "false", "no")
+
+# Optional Prometheus text file rewritten after each dashboard run
+METRICS_FILE = os.environ.get("SIS_METRICS_FILE")
+
+# Finished spans kept for the admin panel and the structured log export
+RECENT_SPANS = 1000
+
+logger = logging.getLogger("sis.instrumentation")
+
+_totals = {}
+_recent = deque(maxlen=RECENT_SPANS)
+_lock = threading.Lock()
+
+
+def _rss_bytes():
+    """Resident memory of this process, or None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _row_count(value):
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray, list)):
+        return len(value)
+    return None
+
+
+class Span:
+    """Time, row count and memory change of one instrumented block"""
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.rows = None
+
+    def __enter__(self):
+        self._memory = _rss_bytes()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        seconds = time.perf_counter() - self._start
+        memory = _rss_bytes()
+        memory_delta = memory - self._memory if memory is not None and self._memory is not None else 0
+        record = {
+            "time": time.time(), "span": self.name, "labels": self.labels, "seconds": seconds,
+            "rows": self.rows, "memory_delta_bytes": memory_delta, "error": exc_type.__name__ if exc_type else None,
+        }
+        key = (self.name, tuple(sorted(self.labels.items())))
+        with _lock:
+            totals = _totals.setdefault(key, {"calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                              "rows": 0, "memory_delta_bytes": 0})
+            totals["calls"] += 1
+            totals["errors"] += exc_type is not None
+            totals["seconds"] += seconds
+            totals["max_seconds"] = max(totals["max_seconds"], seconds)
+            totals["rows"] += self.rows or 0
+            totals["memory_delta_bytes"] += memory_delta
+            _recent.append(record)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(record, default=str))
+        return False
+
+
+class _NoSpan:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, **labels):
+    """Time a block: `with span("section", section=name) as s: ...; s.rows = len(df)`"""
+    if not ENABLED:
+        return _NO_SPAN
+    return Span(name, {key: str(value) for key, value in labels.items()})
+
+
+def timed(name):
+    """Decorator recording a span per call, with the row count of DataFrame/array/list results"""
+    def decorate(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with Span(name, {}) as current:
+                result = function(*args, **kwargs)
+                current.rows = _row_count(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def span_summary():
+    """Return one row per span name and labels with call counts, times, rows and memory change"""
+    with _lock:
+        rows = [
+            {"span": name, "labels": ", ".join(f"{key}={value}" for key, value in labels), **totals}
+            for (name, labels), totals in _totals.items()
+        ]
+    summary = pd.DataFrame(rows, columns=["span", "labels", "calls", "errors", "seconds", "max_seconds", "rows",
+                                          "memory_delta_bytes"])
+    summary["mean_ms"] = summary["seconds"] / summary["calls"].clip(lower=1) * 1000
+    return summary.sort_values("seconds", ascending=False, ignore_index=True)
+
+
+def recent_spans():
+    """Return the most recent finished spans, oldest first"""
+    with _lock:
+        return list(_recent)
+
+
+def json_lines():
+    """Export the recent spans as structured log lines, one JSON object per span"""
+    return "".join(json.dumps(record, default=str) + "\n" for record in recent_spans())
+
+
+def _label_text(labels):
+    """Format (name, value) pairs as a Prometheus label set, escaping the values"""
+    escaped = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def prometheus_text():
+    """Export span totals and data cache hit counts in the Prometheus text format"""
+    from data_loader import cache_stats
+
+    metrics = [
+        ("sis_span_calls_total", "counter", "Instrumented calls", "calls"),
+        ("sis_span_errors_total", "counter", "Instrumented calls that raised", "errors"),
+        ("sis_span_seconds_total", "counter", "Time spent in instrumented calls", "seconds"),
+        ("sis_span_seconds_max", "gauge", "Slowest instrumented call", "max_seconds"),
+        ("sis_span_rows_total", "counter", "Rows returned by instrumented calls", "rows"),
+        ("sis_span_memory_delta_bytes_total", "counter", "Change in resident memory across calls",
+         "memory_delta_bytes"),
+    ]
+    with _lock:
+        totals = dict(_totals)
+    lines = []
+    for metric, kind, description, field in metrics:
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+        for (name, labels), values in totals.items():
+            lines.append(f"{metric}{_label_text((('span', name),) + labels)} {values[field]}")
+    for metric, column in [("sis_cache_hits_total", "hits"), ("sis_cache_misses_total", "misses")]:
+        lines += [f"# HELP {metric} Data cache {column} per file", f"# TYPE {metric} counter"]
+        for row in cache_stats().itertuples(index=False):
+            lines.append(f"{metric}{_label_text((('file', row.file),))} {getattr(row, column)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path=METRICS_FILE):
+    """Atomically rewrite the Prometheus text file, e.g. for node_exporter's textfile collector"""
+    if not ENABLED or not path:
+        return
+    with atomic_path(path) as temp_path, open(temp_path, "w") as file:
+        file.write(prometheus_text())
+
+
+def reset():
+    """Forget every recorded span"""
+    with _lock:
+        _totals.clear()
+        _recent.clear()
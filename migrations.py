@@ -0,0 +1,96 @@
+import os
+import re
+import sys
+
+# Schema migrations run in file name order; each file runs once per database
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql", "migrations")
+MIGRATION_NAME = re.compile(r"^\d{3}_\w+\.sql$")
+
+# Table recording which migrations a database has already applied
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def migration_files(directory=MIGRATIONS_DIR):
+    """Return the migration file names in the order they are applied"""
+    return sorted(name for name in os.listdir(directory) if MIGRATION_NAME.match(name))
+
+
+def _statements(path):
+    """Split a migration file into statements, dropping comment lines"""
+    with open(path, "r") as file:
+        lines = [line for line in file if not line.lstrip().startswith("--")]
+    return [statement.strip() for statement in "".join(lines).split(";") if statement.strip()]
+
+
+# Index creation statements, which the runner skips when the index exists:
+# MySQL commits each DDL statement on its own, so a migration that failed
+# halfway leaves the indexes before the failure in place for the retry
+CREATE_INDEX = re.compile(r"^CREATE\s+INDEX\s+(\w+)\s+ON\s+(\w+)", re.IGNORECASE)
+
+
+def _index_exists(cursor, table, index):
+    """Return whether a table already has an index of that name, on SQLite or MySQL"""
+    if type(cursor).__module__.startswith("sqlite3"):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND name = ?",
+                       (table, index))
+    else:
+        cursor.execute(
+            "SELECT 1 FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+            (table, index),
+        )
+    return bool(cursor.fetchall())
+
+
+def applied_migrations(connection):
+    """Return the names of the migrations already applied to a database"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version VARCHAR(100) PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        cursor.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def apply_migrations(connection, directory=MIGRATIONS_DIR):
+    """Apply every pending migration in order and return the names applied.
+
+    The statements work on both MySQL and SQLite. A failing migration raises
+    and is not recorded, so it is retried on the next run; indexes it already
+    created are skipped then.
+    """
+    done = applied_migrations(connection)
+    applied = []
+    cursor = connection.cursor()
+    try:
+        for name in migration_files(directory):
+            if name in done:
+                continue
+            for statement in _statements(os.path.join(directory, name)):
+                index = CREATE_INDEX.match(statement)
+                if index and _index_exists(cursor, index.group(2), index.group(1)):
+                    continue
+                cursor.execute(statement)
+            # Names are checked against MIGRATION_NAME, so they are safe to inline
+            cursor.execute(f"INSERT INTO {MIGRATIONS_TABLE} (version) VALUES ('{name}')")
+            connection.commit()
+            applied.append(name)
+    finally:
+        cursor.close()
+    return applied
+
+
+if __name__ == "__main__":
+    # Usage: SIS_BACKEND=sqlite|mysql python migrations.py
+    from repository import get_repository
+
+    repository = get_repository()
+    if not hasattr(repository, "connect"):
+        sys.exit("Migrations apply to the sqlite and mysql backends; set SIS_BACKEND")
+    with repository.connect() as connection:
+        applied = apply_migrations(connection)
+    print(f"Applied {len(applied)} migration(s): {', '.join(applied) or 'none pending'}")
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from data_loader import load_csv
+from student_index import StudentIndex
+
+# Primary key of every table shipped under data/, keyed by file name
+PRIMARY_KEYS = {
+    "Academic_Qualification.csv": "academic_id",
+    "Address.csv": "address_id",
+    "Attendance.csv": "attendance_id",
+    "Class_10.csv": "class10_id",
+    "Class_12.csv": "class12_id",
+    "Course.csv": "course_id",
+    "Course_Attendance.csv": "attendance_id",
+    "Degree.csv": "degree_id",
+    "Department.csv": "department_id",
+    "Employment_Type.csv": "emp_type_id",
+    "Enrollment.csv": "enrollment_id",
+    "EventInfo.csv": "event_id",
+    "Faculty.csv": "faculty_id",
+    "Family_Income.csv": "income_id",
+    "Father.csv": "father_id",
+    "Grade.csv": "grade_id",
+    "Guardian_Information.csv": "guardian_id",
+    "Mother.csv": "mother_id",
+    "Name.csv": "name_id",
+    "Parent_Information.csv": "parent_id",
+    "Personal_Details.csv": "personal_id",
+    "Program.csv": "program_id",
+    "Semester_Wise_Marks.csv": "sem_marks_id",
+    "Student.csv": "student_id",
+    "Student_ID_Table.csv": "student_id",
+    "Term.csv": "term_id",
+    "Work_Experience.csv": "work_id",
+}
+
+# Foreign keys between those tables: (child file, column, parent file)
+FOREIGN_KEYS = [
+    ("Personal_Details.csv", "address_id", "Address.csv"),
+    ("Personal_Details.csv", "parent_id", "Parent_Information.csv"),
+    ("Personal_Details.csv", "name_id", "Name.csv"),
+    ("Parent_Information.csv", "guardian_id", "Guardian_Information.csv"),
+    ("Parent_Information.csv", "father_id", "Father.csv"),
+    ("Parent_Information.csv", "mother_id", "Mother.csv"),
+    ("Parent_Information.csv", "income_id", "Family_Income.csv"),
+    ("Enrollment.csv", "course_id", "Course.csv"),
+    ("Course.csv", "term_id", "Term.csv"),
+    ("Term.csv", "program_id", "Program.csv"),
+    ("Faculty.csv", "department_id", "Department.csv"),
+    ("Work_Experience.csv", "emp_type_id", "Employment_Type.csv"),
+    ("Semester_Wise_Marks.csv", "degree_id", "Degree.csv"),
+]
+
+LoadedTables = namedtuple("LoadedTables", ["tables", "indexes", "problems", "timings"])
+
+
+def run_schedule(tasks, max_workers=None):
+    """Run tasks on a thread pool, each as soon as all of its dependencies have finished.
+
+    `tasks` maps a name to (function, [dependency names]); the function is
+    called with a dict of its dependencies' results. Returns {name: result},
+    {name: seconds} and {name: error}; a task whose dependency failed is
+    skipped and reported as an error too.
+    """
+    results, timings, errors = {}, {}, {}
+    pending = dict(tasks)
+    running = {}
+
+    def timed(name, function, inputs):
+        start = time.perf_counter()
+        try:
+            return function(inputs)
+        finally:
+            timings[name] = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, (function, dependencies) in list(pending.items()):
+                if any(dependency in errors for dependency in dependencies):
+                    errors[name] = f"skipped because {', '.join(d for d in dependencies if d in errors)} failed"
+                    del pending[name]
+                elif all(dependency in results for dependency in dependencies):
+                    inputs = {dependency: results[dependency] for dependency in dependencies}
+                    running[pool.submit(timed, name, function, inputs)] = name
+                    del pending[name]
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                if future.exception() is None:
+                    results[name] = future.result()
+                else:
+                    errors[name] = future.exception()
+    return results, timings, errors
+
+
+def _load_table(path, problems):
+    """Read one table through the cached loader and check its primary key"""
+    df = load_csv(path)
+    key = PRIMARY_KEYS.get(os.path.basename(path))
+    if key is not None and key in df.columns and len(df):
+        if df[key].isna().any():
+            problems.append(f"{os.path.basename(path)}: missing values in primary key {key}")
+        elif not df[key].is_unique:
+            problems.append(f"{os.path.basename(path)}: duplicate values in primary key {key}")
+    return df
+
+
+def _join_index(child_file, column, parent_file, child, parent, problems):
+    """Map every child row to the position of its parent row (-1 if it has none)"""
+    key = PRIMARY_KEYS[parent_file]
+    if column not in child.columns or key not in parent.columns:
+        return None
+    positions = pd.Index(parent[key]).get_indexer(child[column])
+    orphans = int(((positions < 0) & child[column].notna().to_numpy()).sum())
+    if orphans:
+        problems.append(f"{child_file}: {orphans} rows reference a missing {parent_file} {key}")
+    return positions
+
+
+def load_tables(directory="data", files=None, max_workers=None):
+    """Load, type-convert and validate a set of tables concurrently.
+
+    `files` maps a table name to its file name (all of PRIMARY_KEYS by
+    default); missing files are skipped. Per-student indexes and foreign-key
+    join indexes are built as soon as the tables they need are loaded.
+    """
+    if files is None:
+        files = {os.path.splitext(filename)[0]: filename for filename in PRIMARY_KEYS}
+    files = {name: filename for name, filename in files.items() if os.path.exists(os.path.join(directory, filename))}
+    names = {filename: name for name, filename in files.items()}
+    problems = []
+
+    def load_task(path):
+        return lambda inputs: _load_table(path, problems)
+
+    def student_index_task(name):
+        return lambda inputs: StudentIndex(inputs[name]) if "student_id" in inputs[name] else None
+
+    def join_task(child_file, column, parent_file, child, parent):
+        return lambda inputs: _join_index(child_file, column, parent_file, inputs[child], inputs[parent], problems)
+
+    tasks = {}
+    for name, filename in files.items():
+        tasks[name] = (load_task(os.path.join(directory, filename)), [])
+        tasks[f"student_index:{name}"] = (student_index_task(name), [name])
+    for child_file, column, parent_file in FOREIGN_KEYS:
+        if child_file in names and parent_file in names:
+            child, parent = names[child_file], names[parent_file]
+            tasks[f"join:{child}.{column}"] = (join_task(child_file, column, parent_file, child, parent), [child, parent])
+
+    results, timings, errors = run_schedule(tasks, max_workers)
+    problems.extend(f"{name}: {error}" for name, error in errors.items())
+    tables = {name: results[name] for name in files if name in results}
+    indexes = {name: value for name, value in results.items() if name not in tables and value is not None}
+    return LoadedTables(tables, indexes, problems, timings)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    loaded = load_tables(sys.argv[1] if len(sys.argv) > 1 else "data")
+    elapsed = time.perf_counter() - start
+    slowest = max(loaded.timings.items(), key=lambda item: item[1], default=("-", 0.0))
+    print(f"Loaded {len(loaded.tables)} tables and {len(loaded.indexes)} indexes in {elapsed:.3f}s")
+    print(f"Slowest task: {slowest[0]} ({slowest[1]:.3f}s); serial sum: {sum(loaded.timings.values()):.3f}s")
+    for problem in loaded.problems:
+        print(f"Problem: {problem}")
@@ -0,0 +1,233 @@
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from atomic_files import atomic_path
+from data_loader import file_signature
+from instrumentation import span
+from profile_materializer import PROFILE_SOURCES, ProfileMaterializer
+from repository import CSV_DIRECTORY, GRADE_SUMMARY_KEYS, CsvRepository, create_repository
+from snapshot import enable_copy_on_write
+
+# Published results live in this folder next to the CSV tables
+PRECOMPUTE_DIR = ".precomputed"
+RESULTS_FILE = "results.pkl"
+HEARTBEAT_FILE = "heartbeat"
+
+# Seconds between the worker's checks of the source tables
+POLL_SECONDS = float(os.environ.get("SIS_PRECOMPUTE_INTERVAL", 5))
+
+# While the worker has checked in within this many seconds, the dashboard
+# keeps serving the last published results even if the sources have moved
+# on (e.g. during a large import); otherwise it computes inline
+STALE_SECONDS = float(os.environ.get("SIS_PRECOMPUTE_STALE", 60))
+
+Results = namedtuple("Results", [
+    "version", "signature", "published", "attendance", "grades", "grade_status_counts",
+    "event_options", "event_metrics", "profiles",
+])
+
+logger = logging.getLogger(__name__)
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _folder(directory):
+    return os.path.join(directory, PRECOMPUTE_DIR)
+
+
+def source_signature(repository, directory=CSV_DIRECTORY):
+    """Return a token that changes whenever the dashboard tables or the profile sources change"""
+    profiles = tuple(
+        file_signature(path) if os.path.exists(path) else None
+        for path in (os.path.join(directory, filename) for filename in PROFILE_SOURCES.values())
+    )
+    return repository.source_signature(), profiles
+
+
+def compute(repository, version, signature, directory=CSV_DIRECTORY):
+    """Compute every aggregate the dashboards read from one pinned view of the data"""
+    pinned = repository.pinned()
+    profiles = None
+    if os.path.exists(os.path.join(directory, PROFILE_SOURCES["student"])):
+        profiles = ProfileMaterializer(directory).refresh().profile_table()
+    return Results(
+        version=version,
+        signature=signature,
+        published=time.time(),
+        attendance=pinned.attendance_summary(),
+        grades={level: pinned.grade_summary(level) for level in GRADE_SUMMARY_KEYS},
+        grade_status_counts=pinned.grade_status_counts(),
+        event_options=pinned.event_options(),
+        event_metrics=pinned.event_metrics(),
+        profiles=profiles,
+    )
+
+
+def publish(results, directory=CSV_DIRECTORY):
+    """Write the results through a temporary file and rename it into place.
+
+    They are stored as a plain dict, so a worker started as a script writes
+    a file that any process can load.
+    """
+    path = os.path.join(_folder(directory), RESULTS_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_path(path) as temp_path, open(temp_path, "wb") as file:
+        pickle.dump(results._asdict(), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _beat(directory):
+    path = os.path.join(_folder(directory), HEARTBEAT_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a"):
+        os.utime(path)
+
+
+def _keep_beating(directory, interval):
+    # Runs on its own thread so a long recompute does not look like a dead worker
+    while True:
+        _beat(directory)
+        time.sleep(interval)
+
+
+def read_results(directory=CSV_DIRECTORY):
+    """Return the last published results, loading the file once per version"""
+    path = os.path.join(_folder(directory), RESULTS_FILE)
+    try:
+        signature = file_signature(path)
+    except OSError:
+        return None
+    key = os.path.abspath(path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+    try:
+        with open(path, "rb") as file:
+            results = Results(**pickle.load(file))
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+        return None
+    with _lock:
+        _cache[key] = (signature, results)
+    return results
+
+
+def worker_alive(directory=CSV_DIRECTORY):
+    """Check whether a worker has checked in within STALE_SECONDS"""
+    try:
+        return time.time() - os.path.getmtime(os.path.join(_folder(directory), HEARTBEAT_FILE)) < STALE_SECONDS
+    except OSError:
+        return False
+
+
+def usable_results(repository, directory=CSV_DIRECTORY):
+    """Return published results the dashboard may serve, or None to compute inline.
+
+    Results match the current data when their signature does; stale results
+    are still served while a worker is alive, since it is already
+    recomputing them.
+    """
+    results = read_results(directory)
+    if results is None:
+        return None
+    if worker_alive(directory) or results.signature == source_signature(repository, directory):
+        return results
+    return None
+
+
+class PrecomputedView:
+    """A repository whose aggregates are read from published results.
+
+    Everything else (lookups, paging, writes) goes to the wrapped repository.
+    """
+
+    def __init__(self, repository, results):
+        self.repository = repository
+        self.results = results
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    def attendance_summary(self, student_id=None):
+        summary = self.results.attendance
+        if student_id is not None:
+            return summary[summary.index == student_id]
+        return summary
+
+    def grade_summary(self, level="student"):
+        return self.results.grades[level]
+
+    def grade_status_counts(self):
+        return self.results.grade_status_counts
+
+    def event_options(self):
+        return self.results.event_options
+
+    def event_metrics(self):
+        return self.results.event_metrics
+
+
+def with_precomputed(repository, directory=CSV_DIRECTORY):
+    """Return the repository reading its aggregates from published results when there are usable ones"""
+    results = usable_results(repository, directory)
+    return PrecomputedView(repository, results) if results is not None else repository
+
+
+def profile_lookup(results, student_id):
+    """Return {table name: one-row DataFrame (empty if unmatched)} from the published profiles"""
+    profiles = results.profiles
+    if student_id not in profiles.index:
+        return {name: pd.DataFrame() for name in PROFILE_SOURCES}
+    row = profiles.loc[[student_id]].iloc[:1].reset_index(drop=True)
+    lookup = {}
+    for name in PROFILE_SOURCES:
+        part = row.filter(regex=f"^{name}\\.")
+        part.columns = [column[len(name) + 1:] for column in part.columns]
+        lookup[name] = part.dropna(how="all")
+    return lookup
+
+
+def run(repository, directory=CSV_DIRECTORY, interval=POLL_SECONDS, once=False):
+    """Watch the source tables and publish fresh results whenever they change"""
+    results = read_results(directory)
+    version = results.version if results is not None else 0
+    published_signature = results.signature if results is not None else None
+    failed_signature = None
+    if not once:
+        _beat(directory)
+        threading.Thread(target=_keep_beating, args=(directory, interval), daemon=True).start()
+    while True:
+        signature = source_signature(repository, directory)
+        if signature not in (published_signature, failed_signature):
+            try:
+                with span("precompute", directory=directory):
+                    results = compute(repository, version + 1, signature, directory)
+                publish(results, directory)
+                version, published_signature = results.version, signature
+                logger.info("Published version %s", version)
+            except Exception:
+                # Most likely a table caught halfway through a write; retry once it changes again
+                failed_signature = signature
+                logger.exception("Precompute failed; keeping version %s", version)
+        if once:
+            return version
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    # Usage: python precompute.py [csv folder] [--once]
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    enable_copy_on_write()
+    arguments = [arg for arg in sys.argv[1:] if arg != "--once"]
+    folder = arguments[0] if arguments else CSV_DIRECTORY
+    backend = create_repository()
+    if backend.name == "csv":
+        backend = CsvRepository(folder)
+    run(backend, folder, once="--once" in sys.argv)
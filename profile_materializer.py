@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import file_signature, load_csv
+
+# Source file of every table that takes part in a student profile
+PROFILE_SOURCES = {
+    "student": "Student_ID_Table.csv",
+    "personal_details": "Personal_Details.csv",
+    "address": "Address.csv",
+    "parent_info": "Parent_Information.csv",
+    "guardian_info": "Guardian_Information.csv",
+    "enrollment": "Enrollment.csv",
+    "course": "Course.csv",
+}
+
+# Foreign-key hops from the student table, in dependency order:
+# (table, parent table, key column shared by both)
+PROFILE_RELATIONS = [
+    ("personal_details", "student", "student_id"),
+    ("address", "personal_details", "address_id"),
+    ("parent_info", "personal_details", "parent_id"),
+    ("guardian_info", "parent_info", "guardian_id"),
+    ("enrollment", "student", "student_id"),
+    ("course", "enrollment", "course_id"),
+]
+
+
+def _hash_join(parent_df, parent_positions, child_df, key):
+    """Resolve each parent row to the first child row sharing `key` (-1 when there is none)"""
+    result = np.full(len(parent_positions), -1, dtype=np.int64)
+    if key not in parent_df.columns or key not in child_df.columns:
+        return result
+
+    child_keys = child_df[key]
+    first_positions = np.flatnonzero((~child_keys.duplicated() & child_keys.notna()).to_numpy())
+    lookup = pd.Index(child_keys.to_numpy()[first_positions])
+
+    matched = parent_positions >= 0
+    parent_keys = parent_df[key].to_numpy()[parent_positions[matched]]
+    found = lookup.get_indexer(parent_keys)
+    result[matched] = np.where(found >= 0, first_positions[found], -1)
+    return result
+
+
+# One consistent version of the materialized profiles; replaced as a whole
+ProfileState = namedtuple("ProfileState", ["tables", "signatures", "positions"])
+
+
+class ProfileMaterializer:
+    """Denormalized per-student profile built from PROFILE_RELATIONS.
+
+    For every student the table holds the resolved row position in each
+    related table, so a profile load is one keyed lookup followed by direct
+    row access. When a source file changes only the hops that depend on it
+    are recomputed. A refresh builds the next state aside and swaps it in
+    with one assignment, so a concurrent lookup sees either version whole.
+    """
+
+    def __init__(self, directory="."):
+        self.directory = directory
+        self.state = ProfileState({}, {}, pd.DataFrame())
+
+    def _path(self, name):
+        return os.path.join(self.directory, PROFILE_SOURCES[name])
+
+    def refresh(self):
+        """Reload changed sources and recompute the hops that depend on them"""
+        state = self.state
+        tables, signatures = dict(state.tables), dict(state.signatures)
+        changed = set()
+        for name in PROFILE_SOURCES:
+            path = self._path(name)
+            signature = file_signature(path) if os.path.exists(path) else None
+            if signature != signatures.get(name, False):
+                signatures[name] = signature
+                tables[name] = load_csv(path) if signature is not None else pd.DataFrame()
+                changed.add(name)
+        if not changed:
+            return self
+
+        if "student" in changed:
+            students = tables["student"]
+            positions = pd.DataFrame(
+                {"student": np.arange(len(students))},
+                index=pd.Index(students["student_id"] if "student_id" in students else [], name="student_id"),
+            )
+            changed.update(name for name, _, _ in PROFILE_RELATIONS)
+        else:
+            positions = state.positions.copy()
+
+        for name, parent, key in PROFILE_RELATIONS:
+            if name in changed or parent in changed:
+                positions[name] = _hash_join(tables[parent], positions[parent].to_numpy(), tables[name], key)
+                changed.add(name)
+        self.state = ProfileState(tables, signatures, positions)
+        return self
+
+    def lookup(self, student_id):
+        """Return {table name: one-row DataFrame (empty if unmatched)} for a student"""
+        tables, _, positions = self.state
+        if student_id not in positions.index:
+            return {name: pd.DataFrame() for name in PROFILE_SOURCES}
+        row = positions.loc[student_id]
+        if isinstance(row, pd.DataFrame):
+            row = row.iloc[0]
+        return {
+            name: tables[name].iloc[[position]] if position >= 0 else tables[name].iloc[0:0]
+            for name, position in row.items()
+        }
+
+    def profile_table(self):
+        """Return the fully denormalized table, one row per student with `table.column` names"""
+        tables, _, positions = self.state
+        parts = []
+        for name in positions.columns:
+            table = tables[name]
+            rows = positions[name].to_numpy()
+            part = table.reindex(range(len(table) + 1)).iloc[np.where(rows >= 0, rows, len(table))]
+            parts.append(part.add_prefix(f"{name}.").reset_index(drop=True))
+        return pd.concat(parts, axis=1).set_index(positions.index)
+
+
+_materializers = {}
+_lock = threading.Lock()
+
+
+def get_profiles(directory="."):
+    """Return the shared profile materializer for a folder, refreshed against its CSVs"""
+    key = os.path.abspath(directory)
+    with _lock:
+        if key not in _materializers:
+            _materializers[key] = ProfileMaterializer(directory)
+        return _materializers[key].refresh()
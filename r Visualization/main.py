@@ -1,20 +1,32 @@
 import streamlit as st
 import pandas as pd
 import os
+import sys
+
+# Share the data-access modules that live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_loader import cached_derived, load_csv
+from table_view import paginated_dataframe, paginated_query
+from student_index import lookup_student
+from profile_materializer import get_profiles
+from grade_rollups import get_grade_rollups
+from parallel_loader import load_tables
+from attendance_aggregates import status_totals, student_attendance as lookup_attendance
+from attendance_stream import get_attendance_summary
+from repository import CsvRepository
+from precompute import profile_lookup, usable_results
+from snapshot import enable_copy_on_write
 
 st.set_page_config(page_title="🎓 Student Support System", layout="wide")
 
+# Sessions share the snapshot's frames; derived frames must not write through to them
+enable_copy_on_write()
+
 st.title("🎓 Student Support System Dashboard")
 
 # Check for required files
 if all(os.path.exists(f) for f in ["Attendance.csv", "Grade.csv", "Student_ID_Table.csv"]):
-    # Load data
-    attendance_df = pd.read_csv("Attendance.csv")
-    grade_df = pd.read_csv("Grade.csv")
-    student_df = pd.read_csv("Student_ID_Table.csv")
-    
-    # Load additional data files if they exist
-    additional_data = {}
+    # Additional data files, loaded if they exist
     data_files = {
         "personal_details": "Personal_Details.csv",
         "address": "Address.csv",
@@ -25,9 +37,32 @@ if all(os.path.exists(f) for f in ["Attendance.csv", "Grade.csv", "Student_ID_Ta
         "enrollment": "Enrollment.csv"
     }
     
-    for key, filename in data_files.items():
-        if os.path.exists(filename):
-            additional_data[key] = pd.read_csv(filename)
+    # Read, type-convert and validate every table concurrently, once per version
+    # of the files rather than on every rerun. The attendance log is not among
+    # them: it is read a window at a time through the repository.
+    table_files = {"grade": "Grade.csv", "student": "Student_ID_Table.csv", **data_files}
+    loaded = cached_derived(
+        ("main_tables", os.path.abspath(".")),
+        [filename for filename in table_files.values() if os.path.exists(filename)],
+        lambda: load_tables(".", table_files),
+    )
+    additional_data = dict(loaded.tables)
+    grade_df = additional_data.pop("grade", None)
+    student_df = additional_data.pop("student", None)
+
+    if loaded.problems:
+        with st.sidebar.expander(f"⚠️ Data problems ({len(loaded.problems)})"):
+            for problem in loaded.problems:
+                st.warning(problem)
+    if grade_df is None or student_df is None:
+        st.error("🚨 Grade.csv or Student_ID_Table.csv could not be loaded; see the data problems in the sidebar.")
+        st.stop()
+
+    repo = CsvRepository(".").pinned()
+
+    # Aggregates published by the precompute worker (`python ../precompute.py .`), if it runs
+    results = usable_results(repo, ".")
+    attendance_summary = results.attendance if results is not None else get_attendance_summary("Attendance.csv")
 
     # Sidebar Navigation
     section = st.sidebar.radio("📁 Select Section", ["Home", "Student Details", "Attendance Overview", "Grades Overview"])
@@ -43,29 +78,30 @@ if all(os.path.exists(f) for f in ["Attendance.csv", "Grade.csv", "Student_ID_Ta
         if st.button("View Student Profile"):
             st.subheader(f"📝 Profile for Student ID: {selected_student}")
             
+            # Every profile hop is resolved by one keyed lookup in the materialized profile
+            if results is not None and results.profiles is not None:
+                profile = profile_lookup(results, selected_student)
+            else:
+                profile = get_profiles().lookup(selected_student)
+            
             # Create columns for better layout
             col1, col2 = st.columns(2)
             
             # Student basic details
             with col1:
                 st.markdown("### 👤 Basic Information")
-                student_info = student_df[student_df['student_id'] == selected_student]
-                st.dataframe(student_info)
+                st.dataframe(profile["student"])
                 
                 # Personal details if available
                 if "personal_details" in additional_data:
-                    personal_info = additional_data["personal_details"][additional_data["personal_details"]['student_id'] == selected_student]
-                    if not personal_info.empty:
+                    if not profile["personal_details"].empty:
                         st.markdown("### 📋 Personal Details")
-                        st.dataframe(personal_info)
+                        st.dataframe(profile["personal_details"])
                         
-                        # Get address through personal details (which has address_id)
-                        if "address" in additional_data and 'address_id' in personal_info.columns:
-                            address_id = personal_info['address_id'].iloc[0]
-                            address_info = additional_data["address"][additional_data["address"]['address_id'] == address_id]
-                            if not address_info.empty:
-                                st.markdown("### 🏠 Address")
-                                st.dataframe(address_info)
+                        # Address resolved through personal details (which has address_id)
+                        if not profile["address"].empty:
+                            st.markdown("### 🏠 Address")
+                            st.dataframe(profile["address"])
                     else:
                         st.info("No personal details available for this student")
             
@@ -73,7 +109,7 @@ if all(os.path.exists(f) for f in ["Attendance.csv", "Grade.csv", "Student_ID_Ta
             with col2:
                 # Grades
                 st.markdown("### 📊 Academic Performance")
-                student_grades = grade_df[grade_df['student_id'] == selected_student]
+                student_grades = lookup_student("Grade.csv", grade_df, selected_student)
                 if not student_grades.empty:
                     st.dataframe(student_grades)
                     
@@ -85,10 +121,10 @@ if all(os.path.exists(f) for f in ["Attendance.csv", "Grade.csv", "Student_ID_Ta
                 
                 # Attendance
                 st.markdown("### 🗓️ Attendance Record")
-                student_attendance = attendance_df[attendance_df['student_id'] == selected_student]
+                student_attendance = repo.student_records("attendance", selected_student)
                 if not student_attendance.empty:
-                    attendance_status = student_attendance['status'].value_counts()
-                    st.write(f"Present: {attendance_status.get('present', 0)}, Absent: {attendance_status.get('absent', 0)}")
+                    attendance_status = lookup_attendance(attendance_summary, selected_student)
+                    st.write(f"Present: {int(attendance_status['Present'])}, Absent: {int(attendance_status['Absent'])}")
                     st.dataframe(student_attendance)
                 else:
                     st.info("No attendance data available for this student")
@@ -98,69 +134,62 @@ if all(os.path.exists(f) for f in ["Attendance.csv", "Grade.csv", "Student_ID_Ta
             col3, col4 = st.columns(2)
             
             with col3:
-                # Parent information
-                if "parent_info" in additional_data:
-                    # Get parent information through personal details (which has parent_id)
-                    if "personal_details" in additional_data and not personal_info.empty and 'parent_id' in personal_info.columns:
-                        parent_id = personal_info['parent_id'].iloc[0]
-                        parent_info = additional_data["parent_info"][additional_data["parent_info"]['parent_id'] == parent_id]
-                        if not parent_info.empty:
-                            st.markdown("#### 👨‍👩‍👧 Parents")
-                            st.dataframe(parent_info)
+                # Parents resolved through personal details (which has parent_id)
+                if not profile["parent_info"].empty:
+                    st.markdown("#### 👨‍👩‍👧 Parents")
+                    st.dataframe(profile["parent_info"])
             
             with col4:
-                # Guardian information
-                if "guardian_info" in additional_data:
-                    # Get guardian info through parent info which has guardian_id
-                    if "parent_info" in additional_data and "personal_details" in additional_data and not personal_info.empty:
-                        parent_id = personal_info['parent_id'].iloc[0]
-                        parent_info = additional_data["parent_info"][additional_data["parent_info"]['parent_id'] == parent_id]
-                        if not parent_info.empty and 'guardian_id' in parent_info.columns:
-                            guardian_id = parent_info['guardian_id'].iloc[0]
-                            guardian_info = additional_data["guardian_info"][additional_data["guardian_info"]['guardian_id'] == guardian_id]
-                            if not guardian_info.empty:
-                                st.markdown("#### 👤 Guardian")
-                                st.dataframe(guardian_info)
+                # Guardian resolved through parent info (which has guardian_id)
+                if not profile["guardian_info"].empty:
+                    st.markdown("#### 👤 Guardian")
+                    st.dataframe(profile["guardian_info"])
             
             # Enrollment and Course Information
             st.markdown("### 📚 Academic Enrollment")
             if "enrollment" in additional_data:
-                enrollment_info = additional_data["enrollment"][additional_data["enrollment"]['student_id'] == selected_student]
+                enrollment_info = lookup_student("Enrollment.csv", additional_data["enrollment"], selected_student)
                 if not enrollment_info.empty:
                     st.dataframe(enrollment_info)
                     
-                    # Join with course data
-                    if "course" in additional_data and 'course_id' in enrollment_info.columns:
-                        course_id = enrollment_info['course_id'].iloc[0]
-                        course_info = additional_data["course"][additional_data["course"]['course_id'] == course_id]
-                        if not course_info.empty:
-                            st.markdown("#### 📕 Course Details")
-                            st.dataframe(course_info)
+                    # Course of the first enrollment
+                    if not profile["course"].empty:
+                        st.markdown("#### 📕 Course Details")
+                        st.dataframe(profile["course"])
 
     elif section == "Student Details":
         st.subheader("📋 Student Details")
-        st.dataframe(student_df)
+        paginated_dataframe(student_df, key="student_details")
 
     elif section == "Attendance Overview":
         st.subheader("📊 Attendance Summary")
-        attendance_summary = attendance_df['status'].value_counts()
         st.write("✅ Overall Attendance Count")
-        st.bar_chart(attendance_summary)
+        st.bar_chart(status_totals(attendance_summary))
 
         st.subheader("📆 Full Attendance Table")
-        st.dataframe(attendance_df)
+        paginated_query(
+            repo.table_columns("attendance"),
+            lambda **query: repo.table_count("attendance", **query),
+            lambda offset, limit, **query: repo.table_page("attendance", offset, limit, **query),
+            key="attendance_table"
+        )
 
     elif section == "Grades Overview":
-        st.subheader("📈 Total Marks per Student")
-        chart_data = grade_df[['student_id', 'total_marks']]
-        st.bar_chart(chart_data.set_index('student_id'))
+        # Read the published or maintained rollups instead of re-aggregating Grade.csv
+        if results is not None:
+            student_rollup, status_chart = results.grades["student"], results.grade_status_counts
+        else:
+            grade_rollups = get_grade_rollups("Grade.csv")
+            student_rollup, status_chart = grade_rollups.table("student"), grade_rollups.status_counts()
+
+        st.subheader("📈 Total Marks per Student (summed across courses)")
+        st.bar_chart(student_rollup['total_sum'].rename('total_marks_sum'))
 
-        st.markdown("🧮 *Pass/Fail Count*")
-        status_chart = grade_df['status'].value_counts()
+        st.markdown("🧮 *Grade Status Count*")
         st.write(status_chart)
 
         st.subheader("📄 Full Grade Sheet")
-        st.dataframe(grade_df)
+        paginated_dataframe(grade_df, key="grade_sheet")
 
 else:
     st.error("🚨 One or more required CSV files (Attendance.csv, Grade.csv, Student_ID_Table.csv) not found in the current directory.")
\ No newline at end of file
@@ -0,0 +1,524 @@
+import abc
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from attendance_aggregates import STATUSES, add_totals
+from data_loader import file_signature
+from instrumentation import timed
+
+# Storage backend for the dashboard: "csv" (default), "sqlite" or "mysql"
+BACKEND = os.environ.get("SIS_BACKEND", "csv").lower()
+
+# Folder holding the CSV tables for the csv backend
+CSV_DIRECTORY = os.environ.get("SIS_CSV_DIR", ".")
+
+# The dashboard's tables: name -> (CSV file / SQL table, primary key).
+# SQL backends expect tables with the same columns as the CSV files.
+TABLES = {
+    "students": ("Student_ID_Table", "student_id"),
+    "attendance": ("Attendance", "attendance_id"),
+    "grades": ("Grade", "grade_id"),
+    "events": ("EventInfo", "event_id"),
+}
+
+# Tables the CSV backend reads a window at a time from their log instead of
+# loading them whole, since they grow without bound
+STREAMED_TABLES = {"attendance"}
+
+# Grouping column of each grade summary level the backends share
+GRADE_SUMMARY_KEYS = {"student": "student_id", "course": "course_id"}
+
+GRADE_SUMMARY_COLUMNS = ["count", "total_sum", "total_min", "total_max", "passed", "failed", "total_mean"]
+
+# Rows per batch when importing CSVs into SQLite
+IMPORT_CHUNK_ROWS = 100_000
+
+
+class CsvRepository:
+    """Dashboard data served from the CSV files through a process-wide snapshot.
+
+    Every session reads the same immutable frames and indexes. A pinned
+    repository keeps reading the snapshot it was pinned to, so one script
+    run sees one consistent version of the data even if a file changes
+    halfway through. The attendance log is never loaded whole: its pages,
+    scans and per-student rows are read from the file through the
+    attendance stream's row checkpoints.
+    """
+
+    name = "csv"
+
+    def __init__(self, directory=CSV_DIRECTORY, snapshot=None, log=None):
+        from snapshot import get_snapshot_manager
+
+        self.directory = directory
+        self.snapshots = get_snapshot_manager(
+            {table: self._path(table) for table in TABLES if table not in STREAMED_TABLES}
+        )
+        self.snapshot = snapshot
+        self.log = log
+
+    def _path(self, table):
+        return os.path.join(self.directory, TABLES[table][0] + ".csv")
+
+    def pinned(self):
+        """Return a view of this repository fixed to the current snapshot"""
+        return CsvRepository(self.directory, self.snapshots.current(), self._log())
+
+    def _snapshot(self):
+        return self.snapshot if self.snapshot is not None else self.snapshots.current()
+
+    def _log(self):
+        from attendance_stream import get_attendance_log
+
+        return self.log if self.log is not None else get_attendance_log(self._path("attendance"))
+
+    def _frame(self, table):
+        return self._snapshot().tables[table]
+
+    def available(self):
+        return all(os.path.exists(self._path(table)) for table in ("students", "attendance", "grades"))
+
+    def source_signature(self):
+        """Return a token that changes whenever one of the CSV files changes"""
+        return tuple(
+            file_signature(self._path(table)) if os.path.exists(self._path(table)) else None for table in TABLES
+        )
+
+    @timed("repository.csv.student_ids")
+    def student_ids(self):
+        return self._frame("students")["student_id"].unique()
+
+    @timed("repository.csv.student_records")
+    def student_records(self, table, student_id):
+        """Return every row of a table that belongs to one student"""
+        from student_index import StudentIndex
+
+        if table in STREAMED_TABLES:
+            return self._log().matching({"student_id": student_id})
+        df = self._frame(table)
+        if df.empty:
+            return df
+        index = self._snapshot().derived(table, "student_index", lambda previous: StudentIndex(df))
+        return index.rows(student_id)
+
+    @timed("repository.csv.attendance_summary")
+    def attendance_summary(self, student_id=None):
+        """Return status counts, total and attendance percentage per student"""
+        from attendance_stream import get_attendance_summary
+
+        summary = get_attendance_summary(self._path("attendance"))
+        if student_id is not None:
+            return summary[summary.index == student_id]
+        return summary
+
+    @timed("repository.csv.grade_summary")
+    def grade_summary(self, level="student"):
+        """Return count, sum, min, max, mean and pass/fail counts of total marks per group"""
+        from grade_rollups import get_grade_rollups
+
+        return get_grade_rollups(self._path("grades")).table(level)[GRADE_SUMMARY_COLUMNS]
+
+    @timed("repository.csv.grade_status_counts")
+    def grade_status_counts(self):
+        from grade_rollups import get_grade_rollups
+
+        return get_grade_rollups(self._path("grades")).status_counts()
+
+    def _event_index(self):
+        from event_index import EventIndex
+
+        df = self._frame("events")
+        if df.empty:
+            return None
+        # A new event version extends a copy of the previous index instead of rebuilding it
+        return self._snapshot().derived(
+            "events", "event_index", lambda previous: (previous.copy() if previous else EventIndex()).refresh(df)
+        )
+
+    @timed("repository.csv.event_options")
+    def event_options(self):
+        index = self._event_index()
+        return index.options() if index is not None else ([], [])
+
+    @timed("repository.csv.event_metrics")
+    def event_metrics(self):
+        index = self._event_index()
+        return index.metrics() if index is not None else (0, 0, 0)
+
+    @timed("repository.csv.add_event")
+    def add_event(self, record):
+        """Append an event; it shows up in the next snapshot, leaving the pinned one untouched"""
+        from event_store import add_event
+
+        return add_event(record, self._path("events"))
+
+    def table_columns(self, table):
+        if table in STREAMED_TABLES:
+            return self._log().columns
+        return list(self._frame(table).columns)
+
+    def _positions(self, table, where, **query):
+        from table_view import frame_positions
+
+        if table in STREAMED_TABLES:
+            # One student's rows are read from their recorded offsets; other equality
+            # filters (e.g. one course) scan the log once per log version
+            df = self._log().matching(where)
+        else:
+            df = self._frame(table)
+        if where and table == "events":
+            index = self._event_index()
+            # A header-only event file has no index, and nothing matches
+            df = index.filter(**where) if index is not None else df
+        elif where and table not in STREAMED_TABLES:
+            df = df[np.logical_and.reduce([df[column] == value for column, value in where.items()])]
+        return df, frame_positions(df, **query)
+
+    @timed("repository.csv.table_count")
+    def table_count(self, table, where=None, **query):
+        """Return how many rows match the equality filters in `where` and the text filter"""
+        from table_view import chunk_count
+
+        query.pop("sort_column", None)
+        query.pop("ascending", None)
+        if table in STREAMED_TABLES and not where:
+            log = self._log()
+            return len(log) if not query.get("filter_text") else chunk_count(log.pieces(), **query)
+        return len(self._positions(table, where, **query)[1])
+
+    @timed("repository.csv.table_page")
+    def table_page(self, table, offset, limit, where=None, **query):
+        """Return one sorted, filtered window of a table"""
+        from table_view import chunk_window
+
+        if table in STREAMED_TABLES and not where:
+            log = self._log()
+            if query.get("sort_column") is None and not query.get("filter_text"):
+                return log.read(offset, offset + limit)
+            return chunk_window(log.pieces(), offset, limit, **query)
+        df, positions = self._positions(table, where, **query)
+        return df.iloc[positions[offset:offset + limit]]
+
+    def iter_rows(self, table, chunk_rows, where=None):
+        """Yield the rows matching the equality filters in `where`, `chunk_rows` at a time"""
+        if table in STREAMED_TABLES:
+            log = self._log()
+            # One student's rows are read directly; any other filter is applied piece by piece
+            pieces = [log.student_rows(where["student_id"])] if where and "student_id" in where else log.pieces()
+            for piece in pieces:
+                if where:
+                    piece = piece[np.logical_and.reduce([piece[column] == value for column, value in where.items()])]
+                for start in range(0, len(piece), chunk_rows):
+                    yield piece.iloc[start:start + chunk_rows]
+            return
+        df, positions = self._positions(table, where)
+        for start in range(0, len(positions), chunk_rows):
+            yield df.iloc[positions[start:start + chunk_rows]]
+
+
+def _param(value):
+    """Return a query parameter the database drivers can bind; they do not accept numpy scalars"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class SqlRepository(abc.ABC):
+    """Dashboard data queried from a database that mirrors the CSV layout.
+
+    Filters, group-bys, per-student lookups and paging are pushed down as
+    parameterized SQL, so only result rows leave the database. Subclasses
+    provide `connect()` and the identifier quote character.
+    """
+
+    quote = '"'
+    placeholder = "%s"
+    explain_prefix = "EXPLAIN "
+
+    def __init__(self):
+        self._columns = {}
+
+    @abc.abstractmethod
+    def connect(self):
+        """Return a context manager that yields an open DB-API connection"""
+
+    def _name(self, identifier):
+        return f"{self.quote}{identifier}{self.quote}"
+
+    def _query(self, query, params=()):
+        """Run a query with %s placeholders and return the rows as a DataFrame"""
+        with self.connect() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query.replace("%s", self.placeholder), tuple(params))
+                columns = [description[0] for description in cursor.description]
+                return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+            finally:
+                cursor.close()
+
+    def explain(self, query, params=()):
+        """Return the database's query plan for a query with %s placeholders"""
+        return self._query(self.explain_prefix + query, params)
+
+    def pinned(self):
+        """The database provides its own consistency, so there is nothing to pin"""
+        return self
+
+    def available(self):
+        try:
+            self.table_columns("students")
+            return True
+        except Exception:
+            return False
+
+    def source_signature(self):
+        """Return the row count and largest key of every table.
+
+        This catches inserts and deletes, which is how the dashboard's tables
+        change; an in-place UPDATE that keeps both the same is not noticed.
+        """
+        return tuple(
+            tuple(self._query(f"SELECT COUNT(*), MAX({self._name(key)}) FROM {self._name(table)}").iloc[0].tolist())
+            for table, key in TABLES.values()
+        )
+
+    def table_columns(self, table):
+        if table not in self._columns:
+            self._columns[table] = list(self._query(f"SELECT * FROM {self._name(TABLES[table][0])} LIMIT 0").columns)
+        return self._columns[table]
+
+    def _column(self, table, column):
+        """Quote a column name after checking that the table has it"""
+        if column not in self.table_columns(table):
+            raise ValueError(f"Unknown column {column!r} for table {table!r}")
+        return self._name(column)
+
+    def _where(self, table, where=None, filter_column=None, filter_text=None):
+        """Build a WHERE clause and its parameters from equality filters and a contains-text filter"""
+        clauses, params = [], []
+        for column, value in (where or {}).items():
+            clauses.append(f"{self._column(table, column)} = %s")
+            params.append(_param(value))
+        if filter_text:
+            columns = self.table_columns(table) if filter_column is None else [filter_column]
+            pattern = "%" + filter_text.lower().replace("!", "!!").replace("%", "!%").replace("_", "!_") + "%"
+            matches = [f"LOWER(CAST({self._column(table, column)} AS CHAR)) LIKE %s ESCAPE '!'" for column in columns]
+            clauses.append("(" + " OR ".join(matches) + ")")
+            params.extend([pattern] * len(matches))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @timed("repository.sql.student_ids")
+    def student_ids(self):
+        table, key = TABLES["students"]
+        rows = self._query(f"SELECT DISTINCT {self._name(key)} FROM {self._name(table)} ORDER BY 1")
+        return rows.iloc[:, 0].to_numpy()
+
+    @timed("repository.sql.student_records")
+    def student_records(self, table, student_id):
+        return self.table_page(table, 0, None, where={"student_id": student_id})
+
+    @timed("repository.sql.attendance_summary")
+    def attendance_summary(self, student_id=None):
+        where, params = self._where("attendance", None if student_id is None else {"student_id": student_id})
+        counts = ", ".join(
+            f"SUM(CASE WHEN LOWER(TRIM(status)) = %s THEN 1 ELSE 0 END) AS {self._name(status)}" for status in STATUSES
+        )
+        summary = self._query(
+            f"SELECT student_id, {counts} FROM {self._name(TABLES['attendance'][0])}{where} "
+            f"GROUP BY student_id ORDER BY student_id",
+            [status.lower() for status in STATUSES] + params,
+        )
+        return add_totals(summary.set_index("student_id").astype("int64"))
+
+    @timed("repository.sql.grade_summary")
+    def grade_summary(self, level="student"):
+        key = self._name(GRADE_SUMMARY_KEYS[level])
+        summary = self._query(
+            f"SELECT {key}, COUNT(*) AS {self._name('count')}, SUM(total_marks) AS total_sum, "
+            f"MIN(total_marks) AS total_min, MAX(total_marks) AS total_max, "
+            f"SUM(CASE WHEN LOWER(TRIM(status)) = 'pass' THEN 1 ELSE 0 END) AS passed, "
+            f"SUM(CASE WHEN LOWER(TRIM(status)) = 'fail' THEN 1 ELSE 0 END) AS failed "
+            f"FROM {self._name(TABLES['grades'][0])} GROUP BY {key} ORDER BY {key}"
+        ).set_index(GRADE_SUMMARY_KEYS[level])
+        summary = summary.apply(pd.to_numeric)
+        return summary.assign(total_mean=summary["total_sum"] / summary["count"])[GRADE_SUMMARY_COLUMNS]
+
+    @timed("repository.sql.grade_status_counts")
+    def grade_status_counts(self):
+        counts = self._query(
+            f"SELECT TRIM(status) AS status, COUNT(*) AS {self._name('count')} "
+            f"FROM {self._name(TABLES['grades'][0])} WHERE status IS NOT NULL GROUP BY TRIM(status) ORDER BY 1"
+        )
+        counts = counts.set_index("status")["count"].astype("int64")
+        return counts.sort_values(ascending=False, kind="stable")
+
+    @timed("repository.sql.event_options")
+    def event_options(self):
+        table = self._name(TABLES["events"][0])
+        return tuple(
+            self._query(f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY 1").iloc[:, 0].tolist()
+            for column in ("student_id", "event_name")
+        )
+
+    @timed("repository.sql.event_metrics")
+    def event_metrics(self):
+        row = self._query(
+            f"SELECT COUNT(DISTINCT event_name), COUNT(DISTINCT student_id), COUNT(achievement) "
+            f"FROM {self._name(TABLES['events'][0])}"
+        ).iloc[0]
+        return tuple(int(value) for value in row)
+
+    @timed("repository.sql.add_event")
+    def add_event(self, record):
+        """Insert one event row and return the event ID the database assigned"""
+        columns = [column for column in self.table_columns("events") if column != "event_id"]
+        query = (f"INSERT INTO {self._name(TABLES['events'][0])} ({', '.join(map(self._name, columns))}) "
+                 f"VALUES ({', '.join([self.placeholder] * len(columns))})")
+        with self.connect() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query, tuple(_param(record.get(column)) for column in columns))
+                connection.commit()
+                return cursor.lastrowid
+            finally:
+                cursor.close()
+
+    @timed("repository.sql.table_count")
+    def table_count(self, table, where=None, filter_column=None, filter_text=None, **_):
+        clause, params = self._where(table, where, filter_column, filter_text)
+        return int(self._query(f"SELECT COUNT(*) FROM {self._name(TABLES[table][0])}{clause}", params).iloc[0, 0])
+
+    @timed("repository.sql.table_page")
+    def table_page(self, table, offset, limit, where=None, sort_column=None, ascending=True,
+                   filter_column=None, filter_text=None):
+        """Return one window of a table; a `limit` of None returns every matching row"""
+        name, key = TABLES[table]
+        clause, params = self._where(table, where, filter_column, filter_text)
+        order = [f"{self._column(table, sort_column)} {'ASC' if ascending else 'DESC'}"] if sort_column else []
+        order.append(self._name(key))
+        query = f"SELECT * FROM {self._name(name)}{clause} ORDER BY {', '.join(order)}"
+        if limit is not None:
+            query += " LIMIT %s OFFSET %s"
+            params += [int(limit), int(offset)]
+        return self._query(query, params)
+
+    def iter_rows(self, table, chunk_rows, where=None):
+        """Yield the rows matching the equality filters in `where` in key order, `chunk_rows` at a time.
+
+        Each chunk continues after the previous chunk's last key instead of
+        using OFFSET, so every chunk costs the same however far the walk goes.
+        """
+        name, key = TABLES[table]
+        clause, params = self._where(table, where)
+        last = None
+        while True:
+            keyset = "" if last is None else (" AND " if clause else " WHERE ") + f"{self._name(key)} > %s"
+            chunk = self._query(
+                f"SELECT * FROM {self._name(name)}{clause}{keyset} ORDER BY {self._name(key)} LIMIT %s",
+                params + ([] if last is None else [last]) + [int(chunk_rows)],
+            )
+            if chunk.empty:
+                return
+            yield chunk
+            if len(chunk) < chunk_rows:
+                return
+            last = int(chunk[key].iat[-1])
+
+
+class SqliteRepository(SqlRepository):
+    """SQL backend on a local SQLite file, a stand-in for MySQL that needs no server"""
+
+    name = "sqlite"
+    placeholder = "?"
+    explain_prefix = "EXPLAIN QUERY PLAN "
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    @contextmanager
+    def connect(self):
+        import sqlite3
+
+        connection = sqlite3.connect(self.path)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def import_csvs(self, directory=CSV_DIRECTORY, chunk_rows=IMPORT_CHUNK_ROWS):
+        """Replace the dashboard's tables with the CSVs in `directory`, streamed in chunks.
+
+        A Student view over Student_ID_Table stands in for the MySQL table of
+        that name, and the schema migrations are then re-applied, which
+        creates the indexes the dashboard's queries rely on.
+        """
+        from migrations import MIGRATIONS_TABLE, apply_migrations
+
+        with self.connect() as connection:
+            connection.execute(f"DROP TABLE IF EXISTS {MIGRATIONS_TABLE}")
+            for name, key in TABLES.values():
+                path = os.path.join(directory, name + ".csv")
+                if not os.path.exists(path):
+                    continue
+                connection.execute(f'DROP TABLE IF EXISTS "{name}"')
+                for number, chunk in enumerate(pd.read_csv(path, chunksize=chunk_rows)):
+                    if number == 0:
+                        # An INTEGER primary key is SQLite's rowid, so new events are numbered automatically
+                        connection.execute(pd.io.sql.get_schema(chunk, name, keys=key, con=connection))
+                    chunk.to_sql(name, connection, if_exists="append", index=False)
+            # db_operations' event listings join the MySQL layout's Student table
+            connection.execute('CREATE VIEW IF NOT EXISTS "Student" AS SELECT * FROM "Student_ID_Table"')
+            connection.commit()
+            apply_migrations(connection)
+        self._columns = {}
+
+
+class MySqlRepository(SqlRepository):
+    """SQL backend on the pooled MySQL connections from db_operations"""
+
+    name = "mysql"
+    quote = "`"
+
+    @contextmanager
+    def connect(self):
+        from db_operations import db_connection
+
+        with db_connection() as connection:
+            if connection is None:
+                raise ConnectionError("Database connection failed")
+            yield connection
+
+
+_repository = None
+_lock = threading.Lock()
+
+
+def create_repository(backend=BACKEND):
+    """Build the repository for a backend name"""
+    if backend == "csv":
+        return CsvRepository()
+    if backend == "sqlite":
+        return SqliteRepository(os.environ.get("DB_SQLITE_PATH", "student_information_system.db"))
+    if backend == "mysql":
+        return MySqlRepository()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_repository():
+    """Return the process-wide repository for the configured backend"""
+    global _repository
+    with _lock:
+        if _repository is None:
+            _repository = create_repository()
+        return _repository
+
+
+if __name__ == "__main__":
+    # Usage: python repository.py [sqlite file] [csv folder]
+    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("DB_SQLITE_PATH", "student_information_system.db")
+    SqliteRepository(target).import_csvs(sys.argv[2] if len(sys.argv) > 2 else CSV_DIRECTORY)
+    print(f"Imported {', '.join(name for name, _ in TABLES.values())} into {target}")
@@ -0,0 +1,326 @@
+import hashlib
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Logical column types. Anything else is a pandas dtype name (e.g. "category",
+# "float32"); integer types are downcast after parsing, once the values are
+# known to fit, and "date" columns are parsed from ISO dates. Upper-case
+# integer types ("Int32") are nullable. Columns that are missing from a file
+# are ignored, and columns without a declared type keep pandas' defaults.
+DATE = "date"
+
+# Declared column types, keyed by CSV file name. The data/ folder shares the
+# file names of the dashboard's tables, so they share a schema too.
+SCHEMAS = {
+    "Attendance.csv": {
+        "attendance_id": "int32",
+        "course_id": "category",
+        "student_id": "int32",
+        "attendance_date": DATE,
+        "status": "category",
+        "remarks": "category",
+    },
+    "Grade.csv": {
+        "grade_id": "int32",
+        "student_id": "int32",
+        "course_id": "category",
+        "cia1": "Int8",
+        "cia2": "Int8",
+        "cia3": "Int8",
+        "cia4": "Int8",
+        "total_marks": "Int16",
+        "credits": "Int8",
+        "status": "category",
+        "remark": "category",
+        "grading_date": DATE,
+    },
+    "Student_ID_Table.csv": {
+        "student_id": "int32",
+        "admission_id": "Int32",
+    },
+    "EventInfo.csv": {
+        "event_id": "int32",
+        "student_id": "int32",
+        "event_name": "category",
+        "event_date": DATE,
+        "event_location": "category",
+        "participation_type": "category",
+        "achievement": "category",
+    },
+    "Academic_Qualification.csv": {
+        "academic_id": "int32",
+        "student_id": "Int32",
+        "exam_type": "category",
+        "board_or_university": "category",
+        "passing_year": "Int16",
+        "percentage_or_cgpa": "float32",
+    },
+    "Address.csv": {
+        "address_id": "int32",
+        "city": "category",
+        "state": "category",
+        "country": "category",
+    },
+    "Class_10.csv": {
+        "class10_id": "int32",
+        "student_id": "Int32",
+        "board": "category",
+        "year_of_passing": "Int16",
+        "month_of_passing": "category",
+        "country_of_institution": "category",
+        "state_of_institution": "category",
+        "obtained_marks": "float32",
+        "total_marks": "float32",
+        "aggregate": "float32",
+    },
+    "Class_12.csv": {
+        "class12_id": "int32",
+        "student_id": "Int32",
+        "board": "category",
+        "year_of_passing": "Int16",
+        "month_of_passing": "category",
+        "country_of_institution": "category",
+        "state_of_institution": "category",
+        "obtained_marks": "float32",
+        "total_marks": "float32",
+        "aggregate": "float32",
+    },
+    "Course.csv": {
+        "course_id": "int32",
+        "term_id": "Int32",
+        "credits": "Int8",
+        "attendance": "float32",
+    },
+    "Course_Attendance.csv": {
+        "attendance_id": "int32",
+        "course_id": "Int32",
+        "student_id": "Int32",
+        "attendance_date": DATE,
+        "status": "category",
+        "remarks": "category",
+    },
+    "Degree.csv": {
+        "degree_id": "int32",
+        "student_id": "Int32",
+        "university": "category",
+        "university_name": "category",
+        "year_of_passing": "Int16",
+        "month_of_passing": "category",
+        "country_of_institution": "category",
+        "state_of_institution": "category",
+        "obtained_marks": "float32",
+        "total_marks": "float32",
+        "aggregate": "float32",
+        "current_passing_semester": "Int8",
+        "current_pending_backlog": "Int8",
+    },
+    "Department.csv": {
+        "department_id": "int32",
+        "head_id": "Int32",
+    },
+    "Employment_Type.csv": {
+        "emp_type_id": "int32",
+    },
+    "Enrollment.csv": {
+        "enrollment_id": "int32",
+        "student_id": "Int32",
+        "course_id": "Int32",
+        "enrollment_date": DATE,
+        "semester_or_term": "category",
+        "status": "category",
+        "mode": "category",
+        "year_of_passing": "Int16",
+        "payment_status": "category",
+        "date_of_payment": DATE,
+    },
+    "Faculty.csv": {
+        "faculty_id": "int32",
+        "program_id": "Int32",
+        "department_id": "Int32",
+        "joining_date": DATE,
+        "designation": "category",
+        "area_of_specialization": "category",
+    },
+    "Family_Income.csv": {
+        "income_id": "int32",
+        "income_range": "category",
+    },
+    "Father.csv": {
+        "father_id": "int32",
+        "occupation": "category",
+        "salary": "category",
+    },
+    "Guardian_Information.csv": {
+        "guardian_id": "int32",
+        "title": "category",
+        "relationship": "category",
+    },
+    "Mother.csv": {
+        "mother_id": "int32",
+        "occupation": "category",
+        "salary": "category",
+    },
+    "Name.csv": {
+        "name_id": "int32",
+    },
+    "Parent_Information.csv": {
+        "parent_id": "int32",
+        "father_occupation": "category",
+        "mother_occupation": "category",
+        "family_income": "category",
+        "father_id": "Int32",
+        "mother_id": "Int32",
+        "income_id": "Int32",
+        "guardian_id": "Int32",
+    },
+    "Personal_Details.csv": {
+        "personal_id": "int32",
+        "student_id": "Int32",
+        "dob": DATE,
+        "name_id": "Int32",
+        "address_id": "Int32",
+        "parent_id": "Int32",
+    },
+    "Program.csv": {
+        "program_id": "int32",
+        "duration": "Int16",
+        "total_terms": "Int8",
+    },
+    "Semester_Wise_Marks.csv": {
+        "sem_marks_id": "int32",
+        "degree_id": "Int32",
+        "semester_number": "Int8",
+        "marks": "float32",
+    },
+    "Student.csv": {
+        "admission_id": "int32",
+        "student_id": "int32",
+    },
+    "Term.csv": {
+        "term_id": "int32",
+        "student_id": "Int32",
+        "program_id": "Int32",
+        "term_start_date": DATE,
+        "term_end_date": DATE,
+    },
+    "Work_Experience.csv": {
+        "work_id": "int32",
+        "student_id": "Int32",
+        "has_experience": "category",
+        "function_area": "category",
+        "emp_type_id": "Int32",
+        "from_date": DATE,
+        "to_date": DATE,
+    },
+}
+
+# Folders reported by `python schemas.py` when no folder is given
+DEFAULT_DIRECTORIES = [".", "data"]
+
+logger = logging.getLogger(__name__)
+
+
+def table_schema(path):
+    """Return the declared column types for a CSV file"""
+    return SCHEMAS.get(os.path.basename(path), {})
+
+
+def schema_token(path):
+    """Return a short token that changes whenever a file's schema changes"""
+    return hashlib.blake2b(repr(sorted(table_schema(path).items())).encode(), digest_size=8).hexdigest()
+
+
+def _is_integer(dtype):
+    return dtype != DATE and pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(dtype))
+
+
+def _convert(values, dtype):
+    """Return `values` as `dtype`, or None if some value would be lost in the conversion"""
+    if dtype == DATE:
+        text = values.str.strip() if pd.api.types.is_string_dtype(values) else values
+        dates = pd.to_datetime(text, errors="coerce", format="ISO8601")
+        return dates if dates.isna().sum() == values.isna().sum() else None
+    target = pd.api.types.pandas_dtype(dtype)
+    if _is_integer(dtype):
+        if values.isna().any() and isinstance(target, np.dtype):
+            return None
+        numbers = values.dropna()
+        if len(numbers):
+            if not pd.api.types.is_numeric_dtype(numbers) or not (numbers == np.floor(numbers)).all():
+                return None
+            bounds = np.iinfo(target.numpy_dtype if hasattr(target, "numpy_dtype") else target)
+            if numbers.min() < bounds.min or numbers.max() > bounds.max:
+                return None
+    try:
+        return values.astype(target)
+    except (TypeError, ValueError):
+        return None
+
+
+def apply_schema(df, schema):
+    """Convert the columns of `df` to their declared types.
+
+    A column whose values do not all fit its declared type is left as
+    parsed (and logged), so unexpected data is never silently changed.
+    """
+    converted = {}
+    for column, dtype in schema.items():
+        if column not in df.columns or (dtype != DATE and df[column].dtype == pd.api.types.pandas_dtype(dtype)):
+            continue
+        values = _convert(df[column], dtype)
+        if values is None:
+            logger.warning("Column %s does not fit the declared type %s and was left as %s",
+                           column, dtype, df[column].dtype)
+        else:
+            converted[column] = values
+    return df.assign(**converted) if converted else df
+
+
+def read_csv(path, columns=None, use_schema=True):
+    """Parse a CSV with its declared schema applied.
+
+    Categorical and float columns are typed while parsing. Integers are
+    parsed at full width and downcast afterwards, because a narrower dtype
+    given to the parser silently wraps values that do not fit.
+    """
+    if not use_schema:
+        return pd.read_csv(path, usecols=columns)
+    schema = table_schema(path)
+    parse_dtypes = {column: dtype for column, dtype in schema.items() if dtype != DATE and not _is_integer(dtype)}
+    try:
+        df = pd.read_csv(path, dtype=parse_dtypes, usecols=columns)
+    except (TypeError, ValueError):
+        # Some value does not parse as its declared type; convert the columns that fit
+        df = pd.read_csv(path, usecols=columns)
+    return apply_schema(df, schema)
+
+
+def memory_report(paths):
+    """Return the in-memory size of each table parsed with and without its schema"""
+    rows = []
+    for path in paths:
+        before = int(read_csv(path, use_schema=False).memory_usage(deep=True).sum())
+        df = read_csv(path)
+        after = int(df.memory_usage(deep=True).sum())
+        rows.append({"file": os.path.relpath(path), "rows": len(df), "before_mb": before / 1024 / 1024,
+                     "after_mb": after / 1024 / 1024, "reduction": before / after if after else np.nan})
+    return pd.DataFrame(rows, columns=["file", "rows", "before_mb", "after_mb", "reduction"])
+
+
+if __name__ == "__main__":
+    # Usage: python schemas.py [folder or CSV ...]
+    paths = []
+    for target in sys.argv[1:] or DEFAULT_DIRECTORIES:
+        if os.path.isdir(target):
+            paths += [os.path.join(target, name) for name in sorted(os.listdir(target))
+                      if name.lower().endswith(".csv") and name in SCHEMAS]
+        elif os.path.exists(target):
+            paths.append(target)
+    report = memory_report(paths)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    before, after = report["before_mb"].sum(), report["after_mb"].sum()
+    print(f"Total: {before:.3f} MB -> {after:.3f} MB ({before / after if after else float('nan'):.1f}x smaller)")
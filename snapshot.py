@@ -0,0 +1,107 @@
+import os
+import threading
+from types import MappingProxyType
+
+import pandas as pd
+
+from data_loader import file_signature, load_csv
+from instrumentation import span
+
+
+def enable_copy_on_write():
+    """Turn on pandas copy-on-write; entry points call this once at startup.
+
+    Frames in a snapshot are shared by every session, so derived frames must
+    never write through to them. This is always the case from pandas 3 on.
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+class Snapshot:
+    """One immutable version of a set of tables.
+
+    Every session that holds the snapshot shares the same frames by
+    reference. Structures derived from a table (indexes and the like) are
+    built once per snapshot and carried over to later versions for as long
+    as that table does not change.
+    """
+
+    def __init__(self, version, tables, signatures, derived=None, previous=None):
+        self.version = version
+        self.tables = MappingProxyType(tables)
+        self.signatures = MappingProxyType(signatures)
+        self._derived = dict(derived or {})
+        self._previous = dict(previous or {})
+        self._lock = threading.Lock()
+
+    def derived(self, table, kind, build):
+        """Return a structure derived from one table, building it on first use.
+
+        `build` receives the same structure from the last version in which
+        the table differed (or None), so it can update it incrementally; it
+        must return a new object rather than modify the one it was given.
+        """
+        key = (table, kind)
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build(self._previous.pop(key, None))
+            return self._derived[key]
+
+    def successor(self, tables, signatures):
+        """Return the next version, sharing every table (and its derived structures) that did not change"""
+        changed = {name for name in tables if signatures[name] != self.signatures.get(name, False)}
+        with self._lock:
+            derived = {key: value for key, value in self._derived.items() if key[0] not in changed}
+            previous = {key: value for key, value in self._derived.items() if key[0] in changed}
+        tables = {name: self.tables[name] if name not in changed else frame for name, frame in tables.items()}
+        return Snapshot(self.version + 1, tables, signatures, derived, previous)
+
+
+class SnapshotManager:
+    """Process-wide current snapshot of a set of CSV tables.
+
+    `current()` checks the files' signatures and, when one changed, builds
+    the next snapshot and swaps it in atomically; sessions still holding an
+    older snapshot keep a consistent view until their next rerun.
+    """
+
+    def __init__(self, sources):
+        self.sources = dict(sources)
+        self._current = Snapshot(0, {}, {})
+        self._lock = threading.Lock()
+
+    def _signatures(self):
+        return {name: file_signature(path) if os.path.exists(path) else None for name, path in self.sources.items()}
+
+    def current(self):
+        """Return the snapshot of the tables as they are on disk now"""
+        signatures = self._signatures()
+        snapshot = self._current
+        if dict(snapshot.signatures) == signatures:
+            return snapshot
+        with self._lock:
+            snapshot = self._current
+            if dict(snapshot.signatures) != signatures:
+                with span("snapshot.refresh"):
+                    tables = {
+                        name: snapshot.tables[name] if signatures[name] == snapshot.signatures.get(name, False)
+                        else load_csv(path) if signatures[name] is not None else pd.DataFrame()
+                        for name, path in self.sources.items()
+                    }
+                    snapshot = snapshot.successor(tables, signatures)
+                self._current = snapshot
+            return snapshot
+
+
+_managers = {}
+_lock = threading.Lock()
+
+
+def get_snapshot_manager(sources):
+    """Return the shared manager for a set of {table name: CSV path} sources"""
+    key = tuple(sorted((name, os.path.abspath(path)) for name, path in sources.items()))
+    with _lock:
+        if key not in _managers:
+            _managers[key] = SnapshotManager(sources)
+        return _managers[key]
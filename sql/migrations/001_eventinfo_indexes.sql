@@ -0,0 +1,14 @@
+-- Indexes for the EventInfo access patterns of the dashboard and db_operations
+
+-- get_student_events: WHERE student_id = ? ORDER BY event_date DESC
+CREATE INDEX idx_eventinfo_student_date ON EventInfo (student_id, event_date);
+
+-- Per-student event lookups and the student filter, in event_id order
+CREATE INDEX idx_eventinfo_student_event ON EventInfo (student_id, event_id);
+
+-- get_all_events: join to Student in event_date order without a sort step;
+-- the other selected columns are still read from the table rows
+CREATE INDEX idx_eventinfo_date_student ON EventInfo (event_date, student_id);
+
+-- The event name filter and its dropdown, in event_id order
+CREATE INDEX idx_eventinfo_name_event ON EventInfo (event_name, event_id);
@@ -0,0 +1,6 @@
+-- Indexes for the Attendance table in the CSV layout (with a student_id column)
+-- that the dashboard queries
+
+-- Per-student lookups in attendance_id order, and the per-student status
+-- counts computed from the index without reading table rows
+CREATE INDEX idx_attendance_student_status ON Attendance (student_id, attendance_id, status);
@@ -0,0 +1,8 @@
+-- Indexes for the Grade table in the CSV layout (with student_id and course_id
+-- columns) that the dashboard queries
+
+-- Per-student lookups in grade_id order, and the per-student marks summary
+CREATE INDEX idx_grade_student_marks ON Grade (student_id, grade_id, status, total_marks);
+
+-- The per-course marks summary, computed from the index without reading table rows
+CREATE INDEX idx_grade_course_marks ON Grade (course_id, status, total_marks);
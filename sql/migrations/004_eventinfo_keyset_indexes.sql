@@ -0,0 +1,8 @@
+-- Indexes for walking EventInfo newest first on the (event_date, event_id) keyset
+-- used by iter_events; the student filter is served by idx_eventinfo_student_date
+
+-- All events, one page after another
+CREATE INDEX idx_eventinfo_date_event ON EventInfo (event_date, event_id);
+
+-- Events with one name, one page after another
+CREATE INDEX idx_eventinfo_name_date ON EventInfo (event_name, event_date, event_id);
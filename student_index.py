@@ -0,0 +1,42 @@
+import numpy as np
+
+from data_loader import cached_derived
+
+
+class StudentIndex:
+    """Row positions of every student's records in one table.
+
+    Rows are stably sorted by student once, so each student's records form a
+    contiguous run of `order` and a lookup only touches that student's rows.
+    """
+
+    def __init__(self, df, key="student_id"):
+        self.df = df
+        values = df[key].to_numpy()
+        self.order = np.argsort(values, kind="stable")
+        uniques, starts, counts = np.unique(values[self.order], return_index=True, return_counts=True)
+        self.bounds = dict(zip(uniques.tolist(), zip(starts.tolist(), (starts + counts).tolist())))
+
+    def __contains__(self, student_id):
+        return student_id in self.bounds
+
+    def positions(self, student_id):
+        """Return the row positions that belong to a student"""
+        start, stop = self.bounds.get(student_id, (0, 0))
+        return self.order[start:stop]
+
+    def rows(self, student_id):
+        """Return a student's rows in their original order"""
+        return self.df.iloc[self.positions(student_id)]
+
+
+def get_student_index(path, df, key="student_id"):
+    """Return the index for a loaded table, rebuilding it only when the file changes"""
+    return cached_derived(("student_index", path, key), [path], lambda: StudentIndex(df, key))
+
+
+def lookup_student(path, df, student_id):
+    """Return a student's rows from a table loaded from `path`"""
+    if df.empty:
+        return df
+    return get_student_index(path, df).rows(student_id)
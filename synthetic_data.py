@@ -0,0 +1,282 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Named dataset sizes for the benchmarks; every count scales from the number of students
+SCALES = {
+    "tiny": {"students": 100, "courses": 10, "days": 20},
+    "small": {"students": 1_000, "courses": 20, "days": 40},
+    "medium": {"students": 10_000, "courses": 50, "days": 60},
+    "large": {"students": 50_000, "courses": 100, "days": 90},
+}
+
+FIRST_STUDENT_ID = 7001
+FIRST_ADMISSION_ID = 3001
+COURSES_PER_STUDENT = 4
+EVENTS_PER_STUDENT = 5
+SEMESTERS = 8
+
+FIRST_NAMES = ["Priya", "Amit", "Sarah", "Raj", "Anita", "Vikram", "Neha", "Arjun", "Kavya", "Rohan"]
+LAST_NAMES = ["Reddy", "Patel", "Khan", "Kumar", "Sharma", "Singh", "Gupta", "Iyer", "Das", "Nair"]
+EVENT_NAMES = [
+    "Annual Tech Symposium", "Cultural Fest", "Hackathon", "Sports Meet", "Debate Competition",
+    "Science Exhibition", "Workshop on AI", "Coding Contest", "Alumni Meet", "Industrial Visit",
+]
+PARTICIPATION_TYPES = ["Participant", "Organizer", "Volunteer", "Speaker", "Presenter", "Attendee"]
+DEPARTMENTS = [("Computer Science", "CSE"), ("Commerce", "COM"), ("Management", "MGT")]
+PROGRAMS = [("B.Tech in Computer Science", "BTCSE", 48, 8), ("B.Com in Finance", "BCF", 36, 6),
+            ("BBA in Marketing", "BBAM", 36, 6)]
+EMPLOYMENT_TYPES = ["Full-time", "Part-time", "Internship", "Freelance"]
+INCOME_RANGES = ["Below 5L", "5L to 10L", "10L to 15L", "Above 15L"]
+
+
+def _ids(count):
+    return np.arange(1, count + 1)
+
+
+def _dates(rng, start, days, count):
+    return (pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, count), unit="D")).strftime("%Y-%m-%d")
+
+
+def _people(rng, count):
+    """Return first and last names for `count` people"""
+    return rng.choice(FIRST_NAMES, count), rng.choice(LAST_NAMES, count)
+
+
+def _students(rng, students):
+    student_ids = FIRST_STUDENT_ID + np.arange(students)
+    first, last = _people(rng, students)
+    student_table = pd.DataFrame({
+        "student_id": student_ids,
+        "personal_details": "Details of " + pd.Series(first) + " " + last,
+        "academic_details": "Academic details for " + pd.Series(first),
+        "work_experience": rng.choice(["Interned at Infosys", "Interned at TCS", "None"], students),
+        "pre_review": rng.choice(["Active learner", "Quick learner", "Good problem solver"], students),
+        "admission_id": FIRST_ADMISSION_ID + np.arange(students),
+    })
+    return student_ids, first, last, student_table
+
+
+def _enrollments(rng, student_ids, courses):
+    """Pick distinct courses for every student: (student_id, course index) per enrollment"""
+    per_student = min(COURSES_PER_STUDENT, courses)
+    picks = np.argsort(rng.random((len(student_ids), courses)), axis=1)[:, :per_student]
+    return np.repeat(student_ids, per_student), picks.ravel()
+
+
+def _attendance(rng, enrolled_students, course_ids, days, start):
+    rows = len(enrolled_students) * days
+    day_offsets = np.tile(np.arange(days), len(enrolled_students))
+    status = rng.choice(["Present", "Absent", "Late"], rows, p=[0.8, 0.15, 0.05])
+    remarks = np.select([status == "Present", status == "Absent"], ["On time", "Sick leave"], "Traffic delay")
+    return pd.DataFrame({
+        "attendance_id": _ids(rows),
+        "course_id": np.repeat(course_ids, days),
+        "student_id": np.repeat(enrolled_students, days),
+        "attendance_date": (pd.Timestamp(start) + pd.to_timedelta(day_offsets, unit="D")).strftime("%Y-%m-%d"),
+        "status": status,
+        "remarks": remarks,
+    })
+
+
+def _grades(rng, enrolled_students, course_ids):
+    rows = len(enrolled_students)
+    cia = rng.integers(8, 26, (rows, 4))
+    total = cia.sum(axis=1)
+    return pd.DataFrame({
+        "grade_id": _ids(rows),
+        "student_id": enrolled_students,
+        "course_id": course_ids,
+        "cia1": cia[:, 0], "cia2": cia[:, 1], "cia3": cia[:, 2], "cia4": cia[:, 3],
+        "total_marks": total,
+        "credits": 4,
+        "status": np.where(total >= 40, "Pass", "Fail"),
+        "remark": np.select([total >= 90, total >= 75, total >= 40],
+                            ["Excellent performance", "Very good performance", "Good performance"],
+                            "Needs improvement"),
+        "grading_date": _dates(rng, "2024-01-15", 180, rows),
+    })
+
+
+def _events(rng, student_ids):
+    rows = len(student_ids) * EVENTS_PER_STUDENT
+    years = rng.integers(2023, 2026, rows).astype(str)
+    return pd.DataFrame({
+        "event_id": _ids(rows),
+        "student_id": rng.choice(student_ids, rows),
+        "event_name": rng.choice(EVENT_NAMES, rows) + " " + years,
+        "event_date": _dates(rng, "2023-01-01", 1095, rows),
+        "event_location": rng.choice(["Campus", "Main Auditorium", "Computer Lab", "Sports Complex"], rows),
+        "participation_type": rng.choice(PARTICIPATION_TYPES, rows),
+        "achievement": np.where(rng.random(rows) < 0.3, rng.choice(["First Place", "Completed", "Runner-up"], rows),
+                                None),
+    })
+
+
+def _related_tables(rng, student_ids, first, last, student_table, courses, enrolled_students, course_picks):
+    """Build the tables under data/, keyed consistently with the student tables"""
+    students = len(student_ids)
+    ids = _ids(students)
+    father_first, _ = _people(rng, students)
+    mother_first, _ = _people(rng, students)
+    income = rng.choice(INCOME_RANGES, students)
+    tables = {
+        "Student.csv": student_table[["admission_id", "student_id"]],
+        "Student_ID_Table.csv": student_table,
+        "Name.csv": pd.DataFrame({"name_id": ids, "first_name": first, "middle_name": None, "last_name": last}),
+        "Address.csv": pd.DataFrame({
+            "address_id": ids, "flat_no_or_plot_no": 100 + ids, "landmark": "Near City Center",
+            "area": "Area-" + pd.Series(ids % 50 + 1).astype(str), "city": "City-" + pd.Series(ids % 20 + 1).astype(str),
+            "state": "State-" + pd.Series(ids % 10 + 1).astype(str), "country": "India", "pincode": 50000 + ids % 1000,
+        }),
+        "Father.csv": pd.DataFrame({
+            "father_id": ids, "first_name": father_first, "middle_name": None, "last_name": last,
+            "contact_number": 981000000 + ids, "mail_id": pd.Series(father_first).str.lower() + ids.astype(str) + "@gmail.com",
+            "occupation": rng.choice(["Engineer", "Doctor", "Business", "Teacher"], students), "salary": "10L",
+        }),
+        "Mother.csv": pd.DataFrame({
+            "mother_id": ids, "first_name": mother_first, "middle_name": None, "last_name": last,
+            "contact_number": 971000000 + ids, "mail_id": pd.Series(mother_first).str.lower() + ids.astype(str) + "@gmail.com",
+            "occupation": rng.choice(["Engineer", "Doctor", "Business", "Teacher"], students), "salary": "8L",
+        }),
+        "Family_Income.csv": pd.DataFrame({"income_id": ids, "income_range": income}),
+        "Guardian_Information.csv": pd.DataFrame({
+            "guardian_id": ids, "title": "Mr.", "full_name": "Guardian " + pd.Series(last), "mobile_number": 991000000 + ids,
+            "mail": "guardian" + pd.Series(ids).astype(str) + "@mail.com", "relationship": "Uncle",
+            "address": "Area-" + pd.Series(ids % 50 + 1).astype(str),
+        }),
+        "Parent_Information.csv": pd.DataFrame({
+            "parent_id": ids, "father_first_name": father_first, "father_middle_name": None, "father_last_name": last,
+            "father_contact_number": 981000000 + ids, "father_occupation": "Engineer",
+            "mother_first_name": mother_first, "mother_middle_name": None, "mother_last_name": last,
+            "mother_contact_number": 971000000 + ids, "mother_occupation": "Teacher", "family_income": income,
+            "father_id": ids, "mother_id": ids, "income_id": ids, "guardian_id": ids,
+        }),
+        "Personal_Details.csv": pd.DataFrame({
+            "personal_id": ids, "student_id": student_ids, "contact_number": 900000000 + ids,
+            "mail_id": pd.Series(first).str.lower() + "." + pd.Series(last).str.lower() + ids.astype(str) + "@student.edu.in",
+            "dob": _dates(rng, "2003-01-01", 1095, students), "name_id": ids, "address_id": ids, "parent_id": ids,
+        }),
+        "Department.csv": pd.DataFrame({
+            "department_id": _ids(len(DEPARTMENTS)), "department_name": [name for name, _ in DEPARTMENTS],
+            "department_code": [code for _, code in DEPARTMENTS], "head_id": None,
+            "description": [f"{name} department" for name, _ in DEPARTMENTS],
+        }),
+        "Program.csv": pd.DataFrame({
+            "program_id": _ids(len(PROGRAMS)), "program_name": [program[0] for program in PROGRAMS],
+            "program_code": [program[1] for program in PROGRAMS], "duration": [program[2] for program in PROGRAMS],
+            "total_terms": [program[3] for program in PROGRAMS],
+        }),
+        "Term.csv": pd.DataFrame({
+            "term_id": ids, "student_id": student_ids, "program_id": rng.integers(1, len(PROGRAMS) + 1, students),
+            "term_start_date": "2023-07-01", "term_end_date": "2023-12-01",
+        }),
+        "Course.csv": pd.DataFrame({
+            "course_id": _ids(courses), "term_id": rng.integers(1, students + 1, courses),
+            "course_name": "Course-" + pd.Series(_ids(courses)).astype(str), "course_code": _course_codes(courses),
+            "credits": rng.choice([3, 4], courses), "attendance": 85.0,
+        }),
+        "Faculty.csv": pd.DataFrame({
+            "faculty_id": _ids(courses), "first_name": rng.choice(FIRST_NAMES, courses), "middle_name": None,
+            "last_name": rng.choice(LAST_NAMES, courses),
+            "email_id": "faculty" + pd.Series(_ids(courses)).astype(str) + "@univ.in",
+            "contact_number": 9876543000 + _ids(courses), "program_id": rng.integers(1, len(PROGRAMS) + 1, courses),
+            "department_id": rng.integers(1, len(DEPARTMENTS) + 1, courses), "joining_date": _dates(rng, "2015-01-01", 3000, courses),
+            "designation": rng.choice(["Professor", "Associate Professor", "Assistant Professor"], courses),
+            "area_of_specialization": "General", "remarks": None,
+        }),
+        "Enrollment.csv": pd.DataFrame({
+            "enrollment_id": _ids(len(enrolled_students)), "student_id": enrolled_students, "course_id": course_picks + 1,
+            "enrollment_date": "2023-06-20", "semester_or_term": "Sem " + pd.Series(course_picks % SEMESTERS + 1).astype(str),
+            "status": "Appearing", "mode": "Regular", "year_of_passing": None, "payment_status": "Paid",
+            "date_of_payment": "2023-06-25",
+        }),
+        "Employment_Type.csv": pd.DataFrame({"emp_type_id": _ids(len(EMPLOYMENT_TYPES)), "type_name": EMPLOYMENT_TYPES}),
+        "Academic_Qualification.csv": pd.DataFrame({
+            "academic_id": ids, "student_id": student_ids, "exam_type": "Class 12", "board_or_university": "CBSE",
+            "school_or_college": "Public School", "passing_year": 2021, "percentage_or_cgpa": rng.integers(60, 99, students),
+        }),
+    }
+    for table, key in [("Class_10.csv", "class10_id"), ("Class_12.csv", "class12_id")]:
+        obtained = rng.integers(300, 500, students)
+        tables[table] = pd.DataFrame({
+            key: ids, "student_id": student_ids, "board": "CBSE", "year_of_passing": 2019 if table == "Class_10.csv" else 2021,
+            "month_of_passing": "March", "country_of_institution": "India", "state_of_institution": "State-1",
+            "institution_name": "Public School", "institution_address": "City-1", "document": None,
+            "obtained_marks": obtained, "total_marks": 500, "aggregate": obtained / 5,
+        })
+    obtained = rng.integers(2000, 4000, students)
+    tables["Degree.csv"] = pd.DataFrame({
+        "degree_id": ids, "student_id": student_ids, "university": "State University", "university_name": "State University",
+        "year_of_passing": 2025, "month_of_passing": "May", "country_of_institution": "India",
+        "state_of_institution": "State-1", "institution_name": "City College", "institution_address": "City-1",
+        "document": None, "obtained_marks": obtained, "total_marks": 4000, "aggregate": obtained / 40,
+        "current_passing_semester": rng.integers(1, SEMESTERS + 1, students), "current_pending_backlog": 0,
+    })
+    tables["Semester_Wise_Marks.csv"] = pd.DataFrame({
+        "sem_marks_id": _ids(students * SEMESTERS), "degree_id": np.repeat(ids, SEMESTERS),
+        "semester_number": np.tile(np.arange(1, SEMESTERS + 1), students), "marks": rng.integers(250, 500, students * SEMESTERS),
+    })
+    working = np.flatnonzero(rng.random(students) < 0.3)
+    tables["Work_Experience.csv"] = pd.DataFrame({
+        "work_id": _ids(len(working)), "student_id": student_ids[working], "has_experience": "Yes",
+        "function_area": rng.choice(["Engineering", "Sales", "Finance"], len(working)),
+        "emp_type_id": rng.integers(1, len(EMPLOYMENT_TYPES) + 1, len(working)),
+        "organization_name": rng.choice(["Infosys", "TCS", "Wipro", "HCL"], len(working)),
+        "organization_address": "City-1", "organization_contact": 8000000000 + working,
+        "registration_number": None, "from_date": "2022-05-01", "to_date": "2022-07-31",
+        "document_upload_path": None, "review_or_comments": None,
+    })
+    return tables
+
+
+def _course_codes(courses):
+    return np.array([f"CS{101 + number}" for number in range(courses)])
+
+
+def generate_dataset(directory, students=1_000, courses=20, days=40, seed=0):
+    """Write a consistent synthetic dataset and return {relative path: row count}.
+
+    The dashboard's tables (Student_ID_Table, Attendance, Grade and
+    EventInfo) are written to `directory`, keyed by course code like the
+    shipped files; every table under data/ is written to `directory/data`
+    with integer course IDs. Each student takes COURSES_PER_STUDENT courses
+    with one attendance row per course per day and one grade per course, and
+    every foreign key points at an existing row.
+    """
+    rng = np.random.default_rng(seed)
+    student_ids, first, last, student_table = _students(rng, students)
+    enrolled_students, course_picks = _enrollments(rng, student_ids, courses)
+    course_codes = _course_codes(courses)
+
+    tables = {
+        "Student_ID_Table.csv": student_table,
+        "Attendance.csv": _attendance(rng, enrolled_students, course_codes[course_picks], days, "2024-01-15"),
+        "Grade.csv": _grades(rng, enrolled_students, course_codes[course_picks]),
+        "EventInfo.csv": _events(rng, student_ids),
+    }
+    related = _related_tables(rng, student_ids, first, last, student_table, courses, enrolled_students, course_picks)
+    related["Attendance.csv"] = tables["Attendance.csv"].assign(course_id=np.repeat(course_picks + 1, days))
+    related["Course_Attendance.csv"] = related["Attendance.csv"]
+    related["Grade.csv"] = tables["Grade.csv"].assign(course_id=course_picks + 1)
+    related["EventInfo.csv"] = tables["EventInfo.csv"]
+
+    os.makedirs(os.path.join(directory, "data"), exist_ok=True)
+    written = {}
+    for folder, group in [("", tables), ("data", related)]:
+        for filename, df in group.items():
+            df.to_csv(os.path.join(directory, folder, filename), index=False)
+            written[os.path.join(folder, filename)] = len(df)
+    return written
+
+
+if __name__ == "__main__":
+    # Usage: python synthetic_data.py <output folder> [tiny|small|medium|large]
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python synthetic_data.py <output folder> [" + "|".join(SCALES) + "]")
+    scale = sys.argv[2] if len(sys.argv) > 2 else "small"
+    written = generate_dataset(sys.argv[1], **SCALES[scale])
+    for path, rows in written.items():
+        print(f"{path}: {rows:,} rows")
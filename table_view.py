@@ -0,0 +1,148 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100, 250]
+NO_SORT = "(none)"
+ALL_COLUMNS = "(any column)"
+
+# Sort orders of recently shown tables: {(id(df), column, ascending): (df, order)}
+_sort_orders = OrderedDict()
+_MAX_SORT_ORDERS = 16
+
+
+def _sort_order(df, column, ascending):
+    """Return row positions of `df` sorted by a column, reusing earlier sorts of the same frame"""
+    key = (id(df), column, ascending)
+    entry = _sort_orders.get(key)
+    if entry is not None and entry[0] is df:
+        _sort_orders.move_to_end(key)
+        return entry[1]
+    values = df[column].reset_index(drop=True)
+    order = values.sort_values(ascending=ascending, kind="stable").index.to_numpy()
+    _sort_orders[key] = (df, order)
+    if len(_sort_orders) > _MAX_SORT_ORDERS:
+        _sort_orders.popitem(last=False)
+    return order
+
+
+def filter_mask(df, column, text):
+    """Return rows whose column (or any column) contains `text`, ignoring case"""
+    columns = df.columns if column in (None, ALL_COLUMNS) else [column]
+    mask = np.zeros(len(df), dtype=bool)
+    for name in columns:
+        values = df[name]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Match against the few distinct labels, then map back to rows
+            matches = values.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+            # Missing values have code -1, which picks the trailing False
+            mask |= np.append(matches, False)[values.cat.codes.to_numpy()]
+        else:
+            mask |= values.astype(str).str.contains(text, case=False, regex=False).to_numpy()
+    return mask
+
+
+def frame_positions(df, sort_column=None, ascending=True, filter_column=None, filter_text=None):
+    """Return the row positions of `df` left after filtering, in display order"""
+    positions = np.arange(len(df)) if sort_column is None else _sort_order(df, sort_column, ascending)
+    if filter_text:
+        mask = filter_mask(df, filter_column, filter_text)
+        positions = positions[mask[positions]]
+    return positions
+
+
+def chunk_count(chunks, filter_column=None, filter_text=None):
+    """Count the rows of a table read in chunks that pass the text filter"""
+    if not filter_text:
+        return sum(len(chunk) for chunk in chunks)
+    return sum(int(filter_mask(chunk, filter_column, filter_text).sum()) for chunk in chunks)
+
+
+def chunk_window(chunks, offset, limit, sort_column=None, ascending=True, filter_column=None, filter_text=None):
+    """Return one sorted, filtered window of a table read in chunks.
+
+    Besides the current chunk, at most `offset + limit` candidate rows are
+    held, so memory depends on how deep the page is rather than on the size
+    of the table. Unsorted windows stop reading once they are full.
+    """
+    keep = offset + limit
+    window = None
+    for chunk in chunks:
+        if filter_text:
+            chunk = chunk[filter_mask(chunk, filter_column, filter_text)]
+        window = chunk if window is None else pd.concat([window, chunk])
+        if sort_column is not None:
+            window = window.sort_values(sort_column, ascending=ascending, kind="stable").iloc[:keep]
+        elif len(window) >= keep:
+            break
+    return window.iloc[offset:keep]
+
+
+def _table_controls(columns, key, page_size):
+    """Draw the filter/sort/page-size widgets and return their choices (None for "no choice")"""
+    filter_col, text_col, sort_col, order_col, size_col = st.columns([2, 2, 2, 1, 1])
+    filter_column = filter_col.selectbox("Filter column", [ALL_COLUMNS] + columns, key=f"{key}_filter_column")
+    filter_text = text_col.text_input("Contains", key=f"{key}_filter_text")
+    sort_column = sort_col.selectbox("Sort by", [NO_SORT] + columns, key=f"{key}_sort_column")
+    ascending = order_col.selectbox("Order", ["Ascending", "Descending"], key=f"{key}_order") == "Ascending"
+    page_size = size_col.selectbox(
+        "Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+        key=f"{key}_page_size"
+    )
+    return {
+        "sort_column": None if sort_column == NO_SORT else sort_column,
+        "ascending": ascending,
+        "filter_column": None if filter_column == ALL_COLUMNS else filter_column,
+        "filter_text": filter_text or None,
+    }, page_size
+
+
+def _page_start(total_rows, page_size, key):
+    """Draw the page selector, clamped to the pages that exist, and return the first row offset"""
+    pages = max(math.ceil(total_rows / page_size), 1)
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    return (page - 1) * page_size
+
+
+def _show_window(window, start, total_rows):
+    st.dataframe(window)
+    if total_rows:
+        st.caption(f"Showing rows {start + 1:,}–{start + len(window):,} of {total_rows:,}")
+    else:
+        st.caption("No matching rows")
+
+
+def paginated_dataframe(df, key, page_size=50):
+    """Show one page of a table with server-side sorting and filtering.
+
+    Only the visible window is sent to the browser, so the payload of each
+    interaction stays the same however large the table grows.
+    """
+    query, page_size = _table_controls(list(df.columns), key, page_size)
+    positions = frame_positions(df, **query)
+    start = _page_start(len(positions), page_size, key)
+    window = df.iloc[positions[start:start + page_size]]
+    _show_window(window, start, len(positions))
+    return window
+
+
+def paginated_query(columns, count, fetch, key, page_size=50):
+    """Show one page of a table whose filtering, sorting and paging run elsewhere.
+
+    `count(sort_column, ascending, filter_column, filter_text)` returns the
+    number of matching rows and `fetch(offset, limit, ...)` with the same
+    keyword arguments returns just that window, so a database backend only
+    ever hands over the rows on screen.
+    """
+    query, page_size = _table_controls(list(columns), key, page_size)
+    total_rows = count(**query)
+    start = _page_start(total_rows, page_size, key)
+    window = fetch(start, page_size, **query)
+    _show_window(window, start, total_rows)
+    return window
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+# The modules under test live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import clear_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    """Start every test without frames cached by an earlier one"""
+    clear_cache()
+    yield
+    clear_cache()
+
+
+@pytest.fixture
+def write_file():
+    """Write text to a file and give it a new modification time, as a later edit would have"""
+    ticks = iter(range(1, 1_000_000))
+
+    def write(path, text, mode="w"):
+        with open(path, mode, newline="") as file:
+            file.write(text)
+        stat = os.stat(path)
+        later = stat.st_mtime_ns + next(ticks) * 1_000_000_000
+        os.utime(path, ns=(later, later))
+
+    return write
@@ -0,0 +1,131 @@
+import pandas as pd
+import pytest
+
+import attendance_stream
+from attendance_stream import AttendanceStream
+
+HEADER = "attendance_id,course_id,student_id,attendance_date,status,remarks\n"
+
+
+def attendance_row(attendance_id, student_id, status="Present", course="CS101"):
+    return f"{attendance_id},{course},{student_id},2024-01-15,{status},On time\n"
+
+
+@pytest.fixture
+def folded(monkeypatch):
+    """Record the number of bytes passed to each fold"""
+    sizes = []
+    fold = AttendanceStream._fold
+
+    def recording(stream, block):
+        sizes.append(len(block))
+        return fold(stream, block)
+
+    monkeypatch.setattr(AttendanceStream, "_fold", recording)
+    return sizes
+
+
+def record_ids(log, student_id):
+    return log.matching({"student_id": student_id})["attendance_id"].tolist()
+
+
+def test_appended_rows_are_folded_alone(tmp_path, write_file, folded):
+    path = tmp_path / "Attendance.csv"
+    write_file(path, HEADER + attendance_row(1, 7001) + attendance_row(2, 7002, "Absent"))
+    stream = AttendanceStream(str(path)).refresh()
+
+    appended = attendance_row(3, 7001, "Late") + attendance_row(4, 7003)
+    write_file(path, appended, mode="a")
+    stream.refresh()
+
+    assert folded[-1] == len(appended)
+    summary = stream.summary()
+    assert summary.loc[7001, ["Present", "Late", "total"]].tolist() == [1, 1, 2]
+    log = stream.log()
+    assert len(log) == 4
+    assert record_ids(log, 7001) == [1, 3]
+    assert log.read(2, 4)["attendance_id"].tolist() == [3, 4]
+
+
+def test_unterminated_last_row_is_folded_once_complete(tmp_path, write_file):
+    path = tmp_path / "Attendance.csv"
+    write_file(path, HEADER + attendance_row(1, 7010) + attendance_row(2, 7010).rstrip("\n"))
+    stream = AttendanceStream(str(path)).refresh()
+
+    assert len(stream.log()) == 2
+    assert stream.summary().loc[7010, "total"] == 2
+    assert record_ids(stream.log(), 7010) == [1, 2]
+
+    # The next writer starts with the missing line break
+    write_file(path, "\n" + attendance_row(3, 7010, "Absent"), mode="a")
+    stream.refresh()
+
+    assert record_ids(stream.log(), 7010) == [1, 2, 3]
+    assert stream.summary().loc[7010, ["Present", "Absent"]].tolist() == [2, 1]
+
+
+def test_partial_last_row_waits_until_the_file_settles(tmp_path, write_file):
+    path = tmp_path / "Attendance.csv"
+    write_file(path, HEADER + attendance_row(1, 7001) + "2,CS101,7002")
+    stream = AttendanceStream(str(path)).refresh()
+    assert len(stream.log()) == 1
+
+    # Written out in place: the stream starts over and reads the finished row
+    write_file(path, ",2024-01-15,Absent,Sick\n", mode="a")
+    stream.refresh()
+    assert stream.summary().loc[7002, "Absent"] == 1
+
+    # A short row that stops changing is counted with its missing columns empty
+    write_file(path, "3,CS101,7003", mode="a")
+    stream.refresh()
+    assert len(stream.log()) == 2
+    stream.refresh()
+    assert len(stream.log()) == 3
+    assert record_ids(stream.log(), 7003) == [3]
+
+
+def test_resumes_from_the_persisted_state(tmp_path, write_file, folded):
+    path = tmp_path / "Attendance.csv"
+    write_file(path, HEADER + attendance_row(1, 7001) + attendance_row(2, 7002))
+    AttendanceStream(str(path)).refresh()
+
+    appended = attendance_row(3, 7002, "Absent")
+    write_file(path, appended, mode="a")
+    # A new instance stands in for a restarted process
+    stream = AttendanceStream(str(path)).refresh()
+
+    assert folded[-1] == len(appended)
+    assert len(folded) == 2
+    assert stream.summary().loc[7002, ["Present", "Absent"]].tolist() == [1, 1]
+    assert record_ids(stream.log(), 7002) == [2, 3]
+
+
+def test_edited_prefix_forces_a_rebuild(tmp_path, write_file):
+    path = tmp_path / "Attendance.csv"
+    write_file(path, HEADER + attendance_row(1, 7001) + attendance_row(2, 7002) + attendance_row(3, 7003))
+    stream = AttendanceStream(str(path)).refresh()
+
+    # Same length, so only the content of an already folded row differs
+    write_file(path, HEADER + attendance_row(1, 7001) + attendance_row(2, 7002, "Absent")
+               + attendance_row(3, 7003))
+    stream.refresh()
+
+    assert stream.summary().loc[7002, ["Present", "Absent"]].tolist() == [0, 1]
+    assert stream.log().matching({"student_id": 7002})["status"].tolist() == ["Absent"]
+
+
+def test_student_lookups_match_a_full_read(tmp_path, write_file, monkeypatch):
+    # Small checkpoint pieces, so the rows span several of them
+    monkeypatch.setattr(attendance_stream, "CHECKPOINT_BYTES", 64)
+    path = tmp_path / "Attendance.csv"
+    rows = [attendance_row(number, 7001 + number % 3, ("Present", "Absent")[number % 2]) for number in range(1, 31)]
+    write_file(path, HEADER + "".join(rows[:20]))
+    stream = AttendanceStream(str(path)).refresh()
+    write_file(path, "".join(rows[20:]), mode="a")
+    log = stream.refresh().log()
+
+    full = pd.read_csv(path)
+    for student_id in (7001, 7002, 7003, 9999):
+        expected = full[full["student_id"] == student_id]
+        assert record_ids(log, student_id) == expected["attendance_id"].tolist()
+        assert log.matching({"student_id": student_id}).index.tolist() == expected.index.tolist()
@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+import grade_rollups
+from grade_rollups import GRADE_LEVELS, GradeRollups, partial_rollup
+
+HEADER = "grade_id,student_id,course_id,cia1,cia2,cia3,cia4,total_marks,credits,status,remark,grading_date\n"
+
+
+def grade_row(grade_id, student_id, total, status="Pass", course="CS101"):
+    return f"{grade_id},{student_id},{course},20,20,20,20,{total},4,{status},Good,2024-03-01\n"
+
+
+@pytest.fixture
+def folded(monkeypatch):
+    """Record the number of rows passed to each fold"""
+    sizes = []
+
+    def recording(grades, keys):
+        if keys == GRADE_LEVELS["student"]:
+            sizes.append(len(grades))
+        return partial_rollup(grades, keys)
+
+    monkeypatch.setattr(grade_rollups, "partial_rollup", recording)
+    return sizes
+
+
+def from_scratch(path):
+    """The per-student rollup computed over the whole file at once"""
+    grades = pd.read_csv(path)
+    return partial_rollup(grades, GRADE_LEVELS["student"])
+
+
+def test_appended_rows_are_folded_alone(tmp_path, write_file, folded):
+    path = tmp_path / "Grade.csv"
+    write_file(path, HEADER + grade_row(1, 7001, 80) + grade_row(2, 7002, 30, "Fail"))
+    rollups = GradeRollups(str(path)).refresh()
+
+    write_file(path, grade_row(3, 7001, 60) + grade_row(4, 7003, 90, "Absent"), mode="a")
+    rollups.refresh()
+
+    assert folded == [2, 2]
+    state = rollups.table("student")
+    assert state.loc[7001, "count"] == 2
+    assert state.loc[7001, "total_sum"] == 140
+    assert rollups.status_counts().to_dict() == {"Pass": 2, "Fail": 1, "Absent": 1}
+    pd.testing.assert_series_equal(state["total_sum"], from_scratch(path)["total_sum"], check_dtype=False,
+                                   check_index_type=False)
+
+
+def test_unterminated_last_row_is_counted_and_completed(tmp_path, write_file):
+    path = tmp_path / "Grade.csv"
+    # The last row is still being written: its grading_date is missing
+    write_file(path, HEADER + grade_row(1, 7001, 80) + grade_row(2, 7002, 30, "Fail")[:-len("2024-03-01\n")])
+    rollups = GradeRollups(str(path)).refresh()
+    assert rollups.table("student")["count"].sum() == 2
+    assert rollups.table("term").loc["Unknown", "count"] == 1
+
+    write_file(path, "2024-03-01\n" + grade_row(3, 7003, 70), mode="a")
+    rollups.refresh()
+
+    terms = rollups.table("term")
+    assert terms.index.tolist() == ["2024-H1"]
+    assert terms.loc["2024-H1", "count"] == 3
+
+
+def test_resumes_from_the_persisted_state(tmp_path, write_file, folded):
+    path = tmp_path / "Grade.csv"
+    write_file(path, HEADER + grade_row(1, 7001, 80) + grade_row(2, 7002, 30, "Fail"))
+    GradeRollups(str(path)).refresh()
+
+    write_file(path, grade_row(3, 7002, 50), mode="a")
+    # A new instance stands in for a restarted process
+    rollups = GradeRollups(str(path)).refresh()
+
+    assert folded == [2, 1]
+    assert rollups.table("student").loc[7002, "total_sum"] == 80
+
+
+def test_edited_prefix_forces_a_rebuild(tmp_path, write_file, folded):
+    path = tmp_path / "Grade.csv"
+    write_file(path, HEADER + grade_row(1, 7001, 80) + grade_row(2, 7002, 84) + grade_row(3, 7003, 90))
+    rollups = GradeRollups(str(path)).refresh()
+
+    # Same length, so only the content of an already folded row differs
+    write_file(path, HEADER + grade_row(1, 7001, 80) + grade_row(2, 7002, 34, "Fail") + grade_row(3, 7003, 90))
+    rollups.refresh()
+
+    assert folded == [3, 3]
+    assert rollups.table("student").loc[7002, "total_sum"] == 34
+    assert rollups.status_counts().to_dict() == {"Pass": 2, "Fail": 1}